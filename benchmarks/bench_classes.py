@@ -0,0 +1,67 @@
+"""
+Class layout benchmark: memory and attribute access of `var` fields with and without __slots__
+
+Usage: python benchmarks/bench_classes.py [--objects 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from easypy_lang.transpiler import EasypyTranspiler
+
+PROGRAM = '''
+class Particle {
+    var x = 0.0
+    var y = 0.0
+    var mass = 1.0
+    func move(dx, dy) {
+        self.x = self.x + dx
+        self.y = self.y + dy
+    }
+}
+'''
+
+
+def _particle_class(slots):
+    transpiler = EasypyTranspiler()
+    py_code = transpiler.transpile(PROGRAM)
+    if not slots:
+        transpiler.class_fields.clear()
+    namespace = {'__name__': '__bench__'}
+    exec(compile(transpiler.python_to_ast(py_code, PROGRAM, '<bench>'), '<bench>', 'exec'), namespace)
+    return namespace['Particle']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--objects', type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{args.objects} objects")
+    print(f"{'layout':<10}{'bytes/obj':>12}{'create s':>10}{'move s':>10}")
+    for label, slots in (('dict', False), ('slots', True)):
+        particle = _particle_class(slots)
+        tracemalloc.start()
+        objects = [particle() for _ in range(args.objects)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del objects
+
+        start = time.perf_counter()
+        objects = [particle() for _ in range(args.objects)]
+        created = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for p in objects:
+            p.move(1.0, 2.0)
+        moved = time.perf_counter() - start
+        print(f"{label:<10}{size / args.objects:>12.1f}{created:>10.3f}{moved:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
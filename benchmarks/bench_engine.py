@@ -0,0 +1,246 @@
+"""
+Engine benchmark: line interpreter vs compiled IR
+
+Usage: python benchmarks/bench_engine.py [--repeat N]
+"""
+
+import argparse
+import contextlib
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from easypy_lang.engine import EasypyEngine
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+SYNTHETIC_LOOP = """
+name = Easypy
+count = 0
+loop 100000 times ---> upper("item {name}")
+"""
+
+# Runs until the 10,000-iteration cap because count never changes
+SYNTHETIC_WHILE = """
+count = 0
+while count < 1 and count != 5 ---> len("abc")
+"""
+
+# Interpolation cost should follow the placeholders, not the namespace size
+WIDE_SCOPE = "\n".join(f"v{i} = {i}" for i in range(1000)) + """
+name = Easypy
+loop 10000 times ---> upper("{name} {v999}")
+"""
+
+
+# ============ BASELINE ============
+# The line interpreter the IR in easypy_lang/ir.py replaced: every line,
+# condition and action is re-parsed each time it runs, and placeholders are
+# filled by scanning every variable. It only calls the engine for values,
+# builtins and modules, never its compiled caches. Kept here only to measure
+# against.
+
+def execute_lines(engine, script):
+    """Run an engine script by re-parsing every line as it runs"""
+    lines = script.split('\n')
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+        engine.line_num = i + 1
+
+        if not line or line.startswith('#'):
+            i += 1
+            continue
+
+        try:
+            # Use statements
+            if line.startswith('use '):
+                module = line.replace('use ', '').strip().split()[0]
+                engine._load_module(module)
+
+            # Variable assignment
+            elif '=' in line and not any(x in line for x in ['==', '!=', '>=', '<=', '--->']) and not line.startswith('if') and not line.startswith('else'):
+                name, val = line.split('=', 1)
+                engine.vars[name.strip()] = engine.get_value(val.strip())
+
+            # If/Else
+            elif line.startswith('if ') and '--->' in line:
+                condition = line.split('--->', 1)[0].replace('if ', '').strip()
+                action = line.split('--->', 1)[1].strip()
+
+                if _evaluate_condition(engine, condition):
+                    _execute_action(engine, action)
+                    i = _skip_else_blocks(lines, i)
+                else:
+                    i = _handle_else_blocks(engine, lines, i)
+
+            # Loops
+            elif line.startswith('loop ') and '--->' in line:
+                match = re.match(r'loop (\d+) times ---> (.*)', line)
+                if match:
+                    count, action = int(match.group(1)), match.group(2).strip()
+                    for _ in range(count):
+                        _execute_action(engine, action)
+
+            # While
+            elif line.startswith('while ') and '--->' in line:
+                condition = line.split('--->', 1)[0].replace('while ', '').strip()
+                action = line.split('--->', 1)[1].strip()
+                iterations = 0
+                while _evaluate_condition(engine, condition) and iterations < 10000:
+                    _execute_action(engine, action)
+                    iterations += 1
+
+            # Function calls
+            elif '(' in line and ')' in line and '=' not in line:
+                _parse_function_call(engine, line)
+
+        except Exception as e:
+            print(f"❌ Error at line {engine.line_num}: {e}")
+
+        i += 1
+
+
+def _interpolate(engine, text):
+    """Fill {var} placeholders by trying every variable in scope"""
+    for var_name, var_val in engine.vars.items():
+        text = text.replace(f'{{{var_name}}}', str(var_val))
+    for var_name, var_val in engine.global_vars.items():
+        text = text.replace(f'{{{var_name}}}', str(var_val))
+    return text
+
+
+def _evaluate_condition(engine, cond):
+    """Evaluate a condition by splitting its text on every call"""
+    cond = cond.strip()
+
+    if ' and ' in cond:
+        return all(_evaluate_condition(engine, p.strip()) for p in cond.split(' and '))
+    if ' or ' in cond:
+        return any(_evaluate_condition(engine, p.strip()) for p in cond.split(' or '))
+    if cond.startswith('not '):
+        return not _evaluate_condition(engine, cond[4:].strip())
+
+    for op in ['==', '!=', '>=', '<=', '>', '<']:
+        if op in cond:
+            left_str, right_str = cond.split(op, 1)
+            left = engine.get_value(left_str.strip())
+            right = engine.get_value(right_str.strip())
+            if op == '==':
+                return left == right
+            elif op == '!=':
+                return left != right
+            elif op == '>=':
+                return left >= right
+            elif op == '<=':
+                return left <= right
+            elif op == '>':
+                return left > right
+            elif op == '<':
+                return left < right
+
+    return bool(engine.get_value(cond))
+
+
+def _parse_function_call(engine, line):
+    """Parse and run a builtin call"""
+    match = re.match(r'(\w+)\((.*)\)$', line.strip())
+    if match:
+        func_name, args_str = match.groups()
+        args = []
+        if args_str.strip():
+            for arg in engine.smart_split(args_str, ','):
+                arg = arg.strip()
+                if (arg.startswith('"') and arg.endswith('"')) or (arg.startswith("'") and arg.endswith("'")):
+                    args.append(_interpolate(engine, arg[1:-1]))
+                else:
+                    args.append(engine.get_value(arg))
+
+        if func_name in engine.functions:
+            return engine.functions[func_name](*args)
+        raise RuntimeError(f"Unknown function: {func_name}")
+    return None
+
+
+def _execute_action(engine, action):
+    """Run an action: a builtin call, or text to print"""
+    action = _interpolate(engine, action.strip())
+    if '(' in action and ')' in action:
+        _parse_function_call(engine, action)
+    else:
+        print(action)
+
+
+def _skip_else_blocks(lines, current):
+    """Skip else/else if blocks"""
+    i = current + 1
+    while i < len(lines):
+        next_line = lines[i].strip()
+        if next_line.startswith('else if ') or next_line.startswith('else '):
+            i += 1
+        else:
+            return i - 1
+    return i - 1
+
+
+def _handle_else_blocks(engine, lines, current):
+    """Handle else/else if blocks"""
+    i = current + 1
+    while i < len(lines):
+        next_line = lines[i].strip()
+        if next_line.startswith('else if ') and '--->' in next_line:
+            condition = next_line.split('--->', 1)[0].replace('else if ', '').strip()
+            action = next_line.split('--->', 1)[1].strip()
+            if _evaluate_condition(engine, condition):
+                _execute_action(engine, action)
+                return _skip_else_blocks(lines, i)
+            i += 1
+        elif next_line.startswith('else ') and '--->' in next_line:
+            action = next_line.split('--->', 1)[1].strip()
+            _execute_action(engine, action)
+            return i
+        else:
+            return i - 1
+    return i - 1
+
+
+
+def _time(run, script, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        engine = EasypyEngine()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            run(engine, script)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'test_comprehensive.ep'), encoding='utf-8') as f:
+        comprehensive = f.read()
+
+    cases = [
+        ('test_comprehensive.ep', comprehensive),
+        ('loop 100000 times', SYNTHETIC_LOOP),
+        ('while x 10000', SYNTHETIC_WHILE),
+        ('1000 vars in scope', WIDE_SCOPE),
+    ]
+
+    print(f"{'case':<24}{'lines (s)':>12}{'IR (s)':>12}{'speedup':>10}")
+    for label, script in cases:
+        old = _time(execute_lines, script, args.repeat)
+        new = _time(EasypyEngine.execute, script, args.repeat)
+        print(f"{label:<24}{old:>12.4f}{new:>12.4f}{old / new:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
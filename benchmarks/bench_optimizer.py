@@ -0,0 +1,83 @@
+"""
+Optimizer benchmark: run time of transpiled programs with each -O pass alone and all together
+
+Usage: python benchmarks/bench_optimizer.py [--repeat 9]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from easypy_lang.optimizer import PASSES, optimize
+from easypy_lang.transpiler import EasypyTranspiler
+
+PROGRAMS = {
+    # Constant expressions and a disabled debug branch inside a hot loop
+    'constants': '''
+total = 0
+debug = false
+for i in range(300000) {
+    total = total + i % (60 * 60 * 24) + 2 ** 8 - 256
+    if false {
+        print("tick {i}")
+    }
+}
+''',
+    # The shape `loop N times` takes, with an invariant expression in its body
+    'invariant': '''
+a = 3
+b = 4
+c = 5
+acc = 0
+loop 300000 times {
+    acc = acc + (a * b + c * a - b) // c
+}
+''',
+    # Builtins called from a function's loop
+    'builtins': '''
+func measure(n) {
+    total = 0
+    for i in range(n) {
+        total = total + len(str(i)) + abs(-i) + min(i, 7)
+    }
+    return total
+}
+result = measure(200000)
+''',
+}
+
+
+def _compile(source, passes):
+    tree = EasypyTranspiler().transpile_ast(source, '<bench>')
+    if passes:
+        tree = optimize(tree, passes)
+    return compile(tree, '<bench>', 'exec')
+
+
+def _best_time(code, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        exec(code, {'__name__': '__main__'})
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=9)
+    args = parser.parse_args()
+
+    configs = [('none', ())] + [(name, (name,)) for name in PASSES] + [('all', tuple(PASSES))]
+    print(f"{'program':<12}" + ''.join(f"{label:>10}" for label, _ in configs))
+    for program, source in PROGRAMS.items():
+        times = [_best_time(_compile(source, passes), args.repeat) for _, passes in configs]
+        print(f"{program:<12}" + ''.join(f"{t:>9.3f}s" for t in times))
+        print(f"{'  speedup':<12}" + ''.join(f"{times[0] / t:>9.2f}x" for t in times))
+
+
+if __name__ == '__main__':
+    main()
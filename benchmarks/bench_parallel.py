@@ -0,0 +1,55 @@
+"""
+Parallel loop benchmark: a CPU-bound `parallel for` run serially, on threads and on processes
+
+Usage: python benchmarks/bench_parallel.py [--items 32] [--work 200000] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from easypy_lang.transpiler import EasypyTranspiler
+
+PROGRAM = '''
+func heavy(n) {{
+    total = 0
+    for i in range(n) {{
+        total = total + i * i % 7
+    }}
+    return total
+}}
+items = [{work}] * {items}
+{loop}
+'''
+
+LOOPS = {
+    'serial': 'results = []\nfor n in items {{\n    results.append(heavy(n))\n}}',
+    'threads': 'results = parallel(threads, workers={workers}) for n in items {{\n    return heavy(n)\n}}',
+    'processes': 'results = parallel(processes, workers={workers}) for n in items {{\n    return heavy(n)\n}}',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=32)
+    parser.add_argument('--work', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{args.items} items, {args.workers} workers, {os.cpu_count()} CPUs")
+    baseline = None
+    for label, loop in LOOPS.items():
+        source = PROGRAM.format(work=args.work, items=args.items, loop=loop.format(workers=args.workers))
+        code = compile(EasypyTranspiler().transpile_ast(source, '<bench>'), '<bench>', 'exec')
+        start = time.perf_counter()
+        exec(code, {'__name__': '__main__'})
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{label:<10}{elapsed:>8.3f}s{baseline / elapsed:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
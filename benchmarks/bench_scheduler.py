@@ -0,0 +1,63 @@
+"""
+Scheduler benchmark: lateness of thousands of `every` timers sharing one scheduler thread
+
+Each job records how late it ran against its ideal time start + k * interval;
+drift that accumulated across runs would show up as lateness growing with k.
+
+Usage: python benchmarks/bench_scheduler.py [--jobs 5000] [--seconds 3]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from easypy_lang.scheduler import Scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--mode', choices=['inline', 'threads'], default='inline')
+    args = parser.parse_args()
+
+    scheduler = Scheduler()
+    lateness = []
+    last_runs = []
+
+    def make_job(interval, start):
+        runs = [0]
+
+        def job():
+            runs[0] += 1
+            late = time.monotonic() - (start + runs[0] * interval)
+            lateness.append(late)
+            last_runs.append((runs[0], late))
+        return job
+
+    rng = random.Random(1)
+    cpu_start = time.process_time()
+    for _ in range(args.jobs):
+        interval = rng.uniform(0.2, 1.0)
+        scheduler.every(interval, make_job(interval, time.monotonic()), args.mode)
+    time.sleep(args.seconds)
+    scheduler.stop()
+    cpu = time.process_time() - cpu_start
+
+    lateness.sort()
+    late_runs = [late for runs, late in last_runs if runs >= 3]
+    print(f"{args.jobs} jobs, {len(lateness)} runs in {args.seconds:g}s ({args.mode})")
+    print(f"lateness ms: median {statistics.median(lateness) * 1000:.2f}, "
+          f"p99 {lateness[int(len(lateness) * 0.99)] * 1000:.2f}, max {lateness[-1] * 1000:.2f}")
+    if late_runs:
+        print(f"median lateness from the third run on: {statistics.median(late_runs) * 1000:.2f} ms")
+    print(f"CPU time: {cpu:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
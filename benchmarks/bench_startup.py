@@ -0,0 +1,89 @@
+"""
+Startup benchmark: import time of `easypy hello.ep`, measured with python -X importtime
+
+Runs the example script in a scratch directory (first a cold run that fills
+__easypycache__, then warm runs) and reports the slowest imports. Exits with
+status 1 when the median total import time exceeds --budget milliseconds or
+when a module that hello.ep never needs gets imported.
+
+Usage: python benchmarks/bench_startup.py [--runs 7] [--budget 45]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HELLO = os.path.join(ROOT, 'easypy_lang', 'examples', 'hello.ep')
+
+# A warm run of hello.ep needs none of these; importing one means something went eager
+FORBIDDEN = (
+    'easypy_lang.engine', 'easypy_lang.modules', 'easypy_lang.optimizer', 'ast',
+    'subprocess', 'sqlite3', 'tkinter', 'requests', 'sklearn', 'numpy',
+)
+
+
+def _importtime(script, cwd):
+    """{module: (self_us, cumulative_us)} for one run of the CLI"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # Measure imports from bytecode, as an installed package would run
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'easypy_lang.cli', script],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget', type=float, default=45.0,
+                        help="maximum median total import time in ms")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='easypy-startup-')
+    try:
+        script = os.path.join(scratch, 'hello.ep')
+        shutil.copy(HELLO, script)
+        cold = _importtime(script, scratch)
+        runs = [_importtime(script, scratch) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    totals = [sum(s for s, _ in run.values()) / 1000 for run in runs]
+    median = statistics.median(totals)
+    print(f"cold run (transpile + cache store): {sum(s for s, _ in cold.values()) / 1000:.1f} ms")
+    print(f"warm runs: median {median:.1f} ms, min {min(totals):.1f} ms over {len(runs)} runs")
+
+    last = runs[-1]
+    print(f"\n{'module':<40}{'self ms':>10}{'cumul ms':>10}")
+    for name, (self_us, cumulative_us) in sorted(last.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+
+    failed = False
+    eager = [name for name in FORBIDDEN if name in last]
+    if eager:
+        print(f"\nFAIL: imported without being used: {', '.join(eager)}")
+        failed = True
+    if median > args.budget:
+        print(f"\nFAIL: median import time {median:.1f} ms is over the {args.budget:.0f} ms budget")
+        failed = True
+    if not failed:
+        print(f"\nOK: within the {args.budget:.0f} ms budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
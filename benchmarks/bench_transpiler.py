@@ -0,0 +1,93 @@
+"""
+Transpiler benchmark: generated .ep sources of 10k, 100k and 1M lines
+
+Each source is written to a file and transpiled both ways: read whole and
+transpile() into a string, and transpile_stream() from the open file to an
+output file. --memory adds a traced run reporting peak allocated memory.
+
+Usage: python benchmarks/bench_transpiler.py [--max-lines 1000000] [--memory]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from easypy_lang.transpiler import EasypyTranspiler
+
+# 10 lines per block, covering the main translation rules
+BLOCK = '''func step_{n}(a, b) {{
+    total = a + b; print("sum {{total}}")
+    if total > 10 && !(a === b) {{ log "big" }} else if total < 0 {{ log 'neg' }}
+    loop 3 times ---> total = total + 1
+    config = {{ "name": "item {n}", "tags": ["a", "b"] }}
+    return total
+}}
+// comment {n}
+x_{n} = step_{n}({n}, 2)
+
+'''
+
+
+def _source(lines):
+    return ''.join(BLOCK.format(n=n) for n in range(lines // 10))
+
+
+def _in_memory(path, out_path):
+    with open(path, 'r', encoding='utf-8') as f:
+        py_code = EasypyTranspiler().transpile(f.read())
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(py_code)
+
+
+def _streaming(path, out_path):
+    with open(path, 'r', encoding='utf-8') as source, \
+            open(out_path, 'w', encoding='utf-8') as out, \
+            open(out_path + '.map', 'wb') as map_out:
+        EasypyTranspiler().transpile_stream(source, out, map_out)
+
+
+def _measure(mode, path, out_path, memory):
+    start = time.perf_counter()
+    mode(path, out_path)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        tracemalloc.start()
+        mode(path, out_path)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-lines', type=int, default=1_000_000)
+    parser.add_argument('--memory', action='store_true', help='Also report peak traced memory')
+    args = parser.parse_args()
+
+    header = f"{'lines':>10}{'MB':>8}{'mode':>8}{'seconds':>10}{'us/line':>10}"
+    print(header + (f"{'peak MB':>10}" if args.memory else ''))
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, 'generated.ep')
+        out_path = os.path.join(scratch, 'generated.py')
+        lines = 10_000
+        while lines <= args.max_lines:
+            source = _source(lines)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            size = len(source) / 1e6
+            del source
+            for label, mode in (('string', _in_memory), ('stream', _streaming)):
+                elapsed, peak = _measure(mode, path, out_path, args.memory)
+                row = f"{lines:>10}{size:>8.1f}{label:>8}{elapsed:>10.3f}{elapsed / lines * 1e6:>10.2f}"
+                print(row + (f"{peak / 1e6:>10.1f}" if peak is not None else ''))
+            lines *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Typed list benchmark: memory and speed of `list<int>` / `list<float>` against plain lists
+
+Usage: python benchmarks/bench_typedlist.py [--items 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from easypy_lang.typedlist import FloatList, IntList
+
+CASES = (
+    ('list of int', list, lambda n: (i * 7 for i in range(n))),
+    ('IntList', IntList, lambda n: (i * 7 for i in range(n))),
+    ('list of float', list, lambda n: (i * 0.5 for i in range(n))),
+    ('FloatList', FloatList, lambda n: (i * 0.5 for i in range(n))),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{args.items} items")
+    print(f"{'container':<16}{'bytes/item':>12}{'build s':>10}{'sum s':>10}{'sort s':>10}")
+    for label, container, values in CASES:
+        tracemalloc.start()
+        items = container(values(args.items))
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del items
+
+        start = time.perf_counter()
+        items = container(values(args.items))
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        sum(items)
+        summed = time.perf_counter() - start
+        start = time.perf_counter()
+        items.sort(reverse=True)
+        ordered = time.perf_counter() - start
+        print(f"{label:<16}{size / args.items:>12.1f}{built:>10.3f}{summed:>10.3f}{ordered:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Value lexer benchmark: list and dict literals of 10^3 to 10^6 elements
+
+Usage: python benchmarks/bench_values.py [--max-exp 6]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from easypy_lang.values import parse_value
+
+
+def _literals(n):
+    yield 'flat ints', '[' + ', '.join(str(i) for i in range(n)) + ']'
+    yield 'strings', '[' + ', '.join(f'"item {i}"' for i in range(n)) + ']'
+    yield 'nested pairs', '[' + ', '.join(f'[{i}, {i}.5]' for i in range(n)) + ']'
+    yield 'dict', '{' + ', '.join(f'k{i}: {{v: [{i}]}}' for i in range(n)) + '}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-exp', type=int, default=6)
+    args = parser.parse_args()
+
+    print(f"{'literal':<16}{'elements':>10}{'seconds':>10}{'ns/elem':>10}")
+    for exp in range(3, args.max_exp + 1):
+        n = 10 ** exp
+        for label, text in _literals(n):
+            start = time.perf_counter()
+            value = parse_value(text)
+            elapsed = time.perf_counter() - start
+            assert len(value) == n
+            print(f"{label:<16}{n:>10}{elapsed:>10.3f}{elapsed / n * 1e9:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
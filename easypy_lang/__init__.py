@@ -7,6 +7,13 @@ __version__ = "1.0.0"
 __author__ = "Easypy Team"
 __license__ = "MIT"
 
-from .engine import EasypyEngine
-
 __all__ = ['EasypyEngine']
+
+
+def __getattr__(name):
+    # The engine is only needed by the interpreter path; transpiled scripts
+    # import easypy_lang.modules_real and should not pay for it
+    if name == 'EasypyEngine':
+        from .engine import EasypyEngine
+        return EasypyEngine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,83 @@
+"""
+Easypy Async
+Runs a compiled script on an event loop, for top-level `await` and `easypy --async`
+"""
+
+import asyncio
+import inspect
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """uvloop's event loop when uvloop is installed, otherwise asyncio's"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
+async def _finish_tasks() -> None:
+    """Wait for tasks the script started but never awaited; re-raise the first failure"""
+    current = asyncio.current_task()
+    while True:
+        pending = [task for task in asyncio.all_tasks() if task is not current and not task.done()]
+        if not pending:
+            return
+        done, _ = await asyncio.wait(pending)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+
+async def _main(code, namespace: dict) -> None:
+    # Code compiled with top-level await returns a coroutine from eval()
+    result = eval(code, namespace)
+    if asyncio.iscoroutine(result):
+        await result
+    await _finish_tasks()
+
+
+def _cancel_tasks(loop: asyncio.AbstractEventLoop) -> None:
+    pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+
+def run_code(code, namespace: dict) -> None:
+    """exec() code with a fresh event loop, driving whatever async work it leaves.
+
+    Code with top-level `await` runs as the body of a coroutine on the
+    loop. Other code runs as plain exec() with the loop set as the current
+    one but not yet running, so the script may call asyncio.run() itself
+    and may start tasks with asyncio.ensure_future(); once it ends, the
+    loop runs only if such tasks are pending. Tasks still running when the
+    script ends are waited for rather than cancelled; an error in one is
+    raised here.
+    """
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        if code.co_flags & inspect.CO_COROUTINE:
+            try:
+                loop.run_until_complete(_main(code, namespace))
+            except RuntimeError as e:
+                if 'running event loop' not in str(e):
+                    raise
+                raise RuntimeError(
+                    "asyncio.run() cannot be used in a script with top-level `await`, which "
+                    "already runs on an event loop; `await` the coroutine instead"
+                ).with_traceback(e.__traceback__) from None
+        else:
+            exec(code, namespace)
+            if any(not task.done() for task in asyncio.all_tasks(loop)):
+                loop.run_until_complete(_finish_tasks())
+    finally:
+        try:
+            _cancel_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -0,0 +1,185 @@
+"""
+Easypy Build
+Ahead-of-time compilation of a project tree into a runnable package or zipapp
+"""
+
+import hashlib
+import importlib.util
+import json
+import marshal
+import os
+import zipapp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .version import CACHE_VERSION
+
+SOURCE_EXTENSIONS = ('.ep', '.easy')
+MANIFEST_NAME = '.easypy-build.json'
+
+# Runs the entry module from the build directory or from inside the zipapp
+MAIN_TEMPLATE = '''import os
+import runpy
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+runpy.run_module({entry!r}, run_name="__main__", alter_sys=True)
+if 'easypy_lang.scheduler' in sys.modules:
+    # Jobs from `every` / `at` keep the program running
+    from easypy_lang.scheduler import run_until_done
+    run_until_done()
+'''
+
+
+class BuildResult:
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.built: List[str] = []
+        self.skipped: List[str] = []
+        self.removed: List[str] = []
+        self.errors: List[Tuple[str, str]] = []
+        self.zipapp: Optional[str] = None
+
+
+def _fingerprint(source: bytes, passes: Sequence[str]) -> str:
+    digest = hashlib.sha256()
+    digest.update(CACHE_VERSION.encode())
+    digest.update(importlib.util.MAGIC_NUMBER)
+    digest.update(",".join(passes).encode())
+    digest.update(b'\0')
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def _output_base(out_dir: str, rel_path: str) -> str:
+    return os.path.join(out_dir, os.path.splitext(rel_path)[0])
+
+
+def _find_sources(src_dir: str, out_dir: str) -> List[str]:
+    """Relative paths of every source file under src_dir, skipping outputs and caches"""
+    sources = []
+    out_dir = os.path.abspath(out_dir)
+    for root, dirs, files in os.walk(src_dir):
+        dirs[:] = sorted(d for d in dirs
+                         if not d.startswith('.') and d not in ('__pycache__', '__easypycache__')
+                         and os.path.abspath(os.path.join(root, d)) != out_dir)
+        for name in sorted(files):
+            if name.endswith(SOURCE_EXTENSIONS):
+                sources.append(os.path.relpath(os.path.join(root, name), src_dir))
+    return sources
+
+
+def compile_file(src_dir: str, rel_path: str, out_dir: str, passes: Sequence[str] = ()) -> str:
+    """Transpile and compile one source into a sourceless .pyc and its .map.json.
+
+    Runs in a worker process, so it only takes and returns plain values.
+    Code is compiled under its project-relative path on .ep lines, so
+    tracebacks from the built program still name the original file.
+    """
+    from .transpiler import EasypyTranspiler
+
+    with open(os.path.join(src_dir, rel_path), 'rb') as f:
+        raw = f.read()
+    source = raw.decode('utf-8')
+
+    transpiler = EasypyTranspiler()
+    py_code = transpiler.transpile(source)
+    # Any module of the project may be imported by another
+    tree = transpiler.python_to_ast(py_code, source, rel_path, importable=True)
+    if passes:
+        from .optimizer import optimize
+        tree = optimize(tree, passes)
+    code = compile(tree, rel_path, 'exec')
+
+    base = _output_base(out_dir, rel_path)
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    # Sourceless pyc: magic, flags, then an unused timestamp and size
+    with open(base + '.pyc', 'wb') as f:
+        f.write(importlib.util.MAGIC_NUMBER + bytes(12) + marshal.dumps(code))
+    with open(base + '.map.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            "source": rel_path.replace(os.sep, '/'),
+            "lines": sorted(transpiler.source_map.items()),
+        }, f)
+    return _fingerprint(raw, passes)
+
+
+def _load_manifest(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_project(src_dir: str, out_dir: Optional[str] = None, entry: str = 'main',
+                  make_zipapp: bool = False, jobs: Optional[int] = None,
+                  passes: Sequence[str] = ()) -> BuildResult:
+    """Compile every .ep/.easy file under src_dir into out_dir (default src_dir/build).
+
+    Files whose source, transpiler version and passes are unchanged since
+    the last build are skipped; outputs of deleted sources are removed.
+    out_dir gets a __main__.py running `entry`, and make_zipapp also packs
+    it into out_dir + '.pyz'.
+    """
+    out_dir = out_dir or os.path.join(src_dir, 'build')
+    result = BuildResult(out_dir)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    previous = _load_manifest(manifest_path).get("files", {})
+    manifest: Dict[str, str] = {}
+
+    pending = []
+    for rel_path in _find_sources(src_dir, out_dir):
+        with open(os.path.join(src_dir, rel_path), 'rb') as f:
+            fingerprint = _fingerprint(f.read(), passes)
+        if previous.get(rel_path) == fingerprint and os.path.exists(_output_base(out_dir, rel_path) + '.pyc'):
+            manifest[rel_path] = fingerprint
+            result.skipped.append(rel_path)
+        else:
+            pending.append(rel_path)
+
+    for rel_path in previous:
+        if rel_path not in manifest and rel_path not in pending:
+            base = _output_base(out_dir, rel_path)
+            for suffix in ('.pyc', '.map.json'):
+                if os.path.exists(base + suffix):
+                    os.remove(base + suffix)
+            result.removed.append(rel_path)
+
+    os.makedirs(out_dir, exist_ok=True)
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {rel_path: pool.submit(compile_file, src_dir, rel_path, out_dir, tuple(passes))
+                       for rel_path in pending}
+            outcomes = []
+            for rel_path, future in futures.items():
+                try:
+                    outcomes.append((rel_path, future.result(), None))
+                except Exception as e:
+                    outcomes.append((rel_path, None, e))
+    else:
+        outcomes = []
+        for rel_path in pending:
+            try:
+                outcomes.append((rel_path, compile_file(src_dir, rel_path, out_dir, passes), None))
+            except Exception as e:
+                outcomes.append((rel_path, None, e))
+
+    for rel_path, fingerprint, error in outcomes:
+        if error is not None:
+            result.errors.append((rel_path, str(error)))
+        else:
+            manifest[rel_path] = fingerprint
+            result.built.append(rel_path)
+
+    with open(os.path.join(out_dir, '__main__.py'), 'w', encoding='utf-8') as f:
+        f.write(MAIN_TEMPLATE.format(entry=entry))
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({"files": dict(sorted(manifest.items()))}, f, indent=2)
+
+    if make_zipapp and not result.errors:
+        target = out_dir.rstrip(os.sep) + '.pyz'
+        zipapp.create_archive(out_dir, target, interpreter='/usr/bin/env python3',
+                              filter=lambda path: path.name != MANIFEST_NAME)
+        result.zipapp = target
+    return result
@@ -0,0 +1,85 @@
+"""
+Easypy Cache
+Transpiled and compiled scripts kept on disk next to their source, like __pycache__
+"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+from types import CodeType
+from typing import Dict, Optional, Tuple
+
+from .version import CACHE_VERSION
+
+CACHE_DIR = "__easypycache__"
+
+
+def cache_path(filename: str) -> Optional[str]:
+    """Cache file for a script, or None when this interpreter has no cache tag"""
+    tag = sys.implementation.cache_tag
+    if tag is None:
+        return None
+    directory, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, CACHE_DIR, f"{name}.{tag}.epc")
+
+
+def source_key(source: str, code_filename: str, options: str = "") -> bytes:
+    """Digest of everything the cached entry was built from.
+
+    The code filename is included because it is baked into the code object
+    and the profilers match frames on it; options names anything else that
+    changes the compiled code, such as the optimization passes.
+    """
+    digest = hashlib.sha256()
+    digest.update(CACHE_VERSION.encode())
+    digest.update(importlib.util.MAGIC_NUMBER)
+    digest.update(code_filename.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(options.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(source.encode('utf-8'))
+    return digest.digest()
+
+
+def load(filename: str, source: str, code_filename: str,
+         options: str = "") -> Optional[Tuple[str, CodeType, Dict[int, int]]]:
+    """(python source, code object, source map) cached for this exact source, if any"""
+    path = cache_path(filename)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    key = source_key(source, code_filename, options)
+    if not data.startswith(key):
+        return None
+    try:
+        py_code, code, source_map = marshal.loads(data[len(key):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    return py_code, code, source_map
+
+
+def store(filename: str, source: str, code_filename: str, py_code: str, code: CodeType,
+          source_map: Dict[int, int], options: str = "") -> None:
+    """Save a compiled script; an unwritable cache just means no cache"""
+    path = cache_path(filename)
+    if path is None:
+        return
+    data = source_key(source, code_filename, options) + marshal.dumps((py_code, code, source_map))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
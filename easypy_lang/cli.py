@@ -6,27 +6,26 @@ Command-line interface for running Easypy scripts
 import sys
 import os
 import argparse
-from pathlib import Path
-from .engine import EasypyEngine
-
-try:
-    from rich.console import Console
-    from rich.panel import Panel
-    from rich.theme import Theme
-except Exception:
-    Console = None
-    Panel = None
-    Theme = None
 
+# rich is optional and slow to import, so it is loaded on first use
+Panel = None
 _console = None
+_console_loaded = False
+
+# inspect.CO_COROUTINE: set on code compiled from a script with top-level await
+_CO_COROUTINE = 0x80
 
 def _get_console():
-    global _console
-    if _console is not None:
-        return _console
-    if Console is None:
-        _console = None
+    global _console, _console_loaded, Panel
+    if _console_loaded:
         return _console
+    _console_loaded = True
+    try:
+        from rich.console import Console
+        from rich.panel import Panel
+        from rich.theme import Theme
+    except Exception:
+        return None
     _console = Console(theme=Theme({
         "primary": "bold cyan",
         "accent": "bold magenta",
@@ -62,10 +61,27 @@ Commands:
     --help                  Show this help
     --examples              Show example scripts
     --interactive           Run interactive mode
+    build DIR               Compile a project ahead of time
+                            (--out DIR, --zipapp, --jobs N, --entry NAME, -O)
+    transpile FILE          Stream FILE's Python translation to FILE.py
+                            (-o OUT or - for stdout, --no-map)
+    cache info|clear        Show or delete the results saved by `disk cache`
+                            (--dir DIR, default .easypy_cache)
 
 Options:
     --debug                 Enable debug mode
     --verbose               Verbose output
+    --no-cache              Don't reuse or write __easypycache__
+    --async                 Give the script an event loop (uvloop if
+                            installed) and finish the tasks it leaves;
+                            automatic with top-level await
+    -O                      Optimize: fold constants, drop dead branches,
+                            hoist loop invariants, alias builtins to locals
+    --passes LIST           Only run these passes (fold,dead,hoist,locals)
+    --profile               Time every .ep line and print the slowest
+    --memprofile            Trace memory allocated by every .ep line
+    --memprofile-interval S Snapshot memory every S seconds while running
+    --profile-output FILE   Where to save the profile (.json or .prof)
 
 Examples:
     easypy hello.ep
@@ -162,6 +178,7 @@ def run_interactive():
         print("✨ Welcome to Easypy Interactive Mode!")
     print("Type 'help' for commands, 'exit' to quit\n")
     
+    from .engine import EasypyEngine
     engine = EasypyEngine(debug=False)
     
     while True:
@@ -212,6 +229,7 @@ Available commands:
 
 def list_modules():
     """List available modules"""
+    from .engine import EasypyEngine
     engine = EasypyEngine()
     print_header()
     console = _get_console()
@@ -261,8 +279,10 @@ def deploy_project(target, project_name):
 FROM python:3.9-slim
 WORKDIR /app
 COPY . .
-RUN pip install requests pandas matplotlib discord.py openai flask scikit-learn
-CMD ["easypy", "{project_name}/main.easy"]
+RUN pip install easypy-lang requests pandas matplotlib discord.py openai flask scikit-learn
+# Transpile and compile once at image build time, not on every start
+RUN easypy build {project_name} --zipapp
+CMD ["python", "{project_name}/build.pyz"]
 """
         try:
             if not os.path.exists(project_name):
@@ -299,8 +319,122 @@ def install_dependencies():
     print("   - installing visualization tools... OK")
     print("✅ Successfully installed easypy-lang[all]")
 
-def run_file(filename, debug=False, use_transpiler=True):
-    """Run an Easypy script file"""
+def build_command(argv):
+    """easypy build <dir>: compile a whole project ahead of time"""
+    parser = argparse.ArgumentParser(prog='easypy build', description='Compile every .ep/.easy file in a project')
+    parser.add_argument('project', help='Project directory')
+    parser.add_argument('--out', help='Output directory (default: <project>/build)')
+    parser.add_argument('--entry', default='main', help='Module run by the built package (default: main)')
+    parser.add_argument('--zipapp', action='store_true', help='Also pack the build into <out>.pyz')
+    parser.add_argument('--jobs', '-j', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('-O', action='store_true', dest='optimize', help='Run the optimizer passes')
+    parser.add_argument('--passes', help='Optimization passes to run (comma separated)')
+    args = parser.parse_args(argv)
+    
+    if not os.path.isdir(args.project):
+        print(f"❌ Error: Directory '{args.project}' not found!")
+        sys.exit(1)
+    passes = ()
+    if args.optimize or args.passes:
+        from .optimizer import parse_passes
+        try:
+            passes = parse_passes(args.passes)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+    
+    from .build import build_project
+    result = build_project(args.project, args.out, entry=args.entry, make_zipapp=args.zipapp,
+                           jobs=args.jobs, passes=passes)
+    print(f"🔨 Built {len(result.built)}, unchanged {len(result.skipped)}, removed {len(result.removed)}")
+    for rel_path, error in result.errors:
+        print(f"❌ {rel_path}: {error}")
+    if result.errors:
+        sys.exit(1)
+    print(f"✅ Output: {result.out_dir}  (run: python {result.out_dir})")
+    if result.zipapp:
+        print(f"📦 Zipapp: {result.zipapp}  (run: python {result.zipapp})")
+
+def transpile_command(argv):
+    """easypy transpile <file>: write the Python translation without running it"""
+    parser = argparse.ArgumentParser(prog='easypy transpile', description='Translate an .ep file to Python, streaming')
+    parser.add_argument('script', help='Easypy script file (.ep)')
+    parser.add_argument('-o', '--out', help='Output file, or - for stdout (default: SCRIPT with .py)')
+    parser.add_argument('--no-map', action='store_true', dest='no_map',
+                        help="Don't write the OUT.map source map")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.script):
+        print(f"❌ Error: File '{args.script}' not found!")
+        sys.exit(1)
+    out_path = args.out or os.path.splitext(args.script)[0] + '.py'
+    to_stdout = out_path == '-'
+    map_path = None if args.no_map or to_stdout else out_path + '.map'
+
+    from .transpiler import EasypyTranspiler
+    transpiler = EasypyTranspiler()
+    # The .ep file is read a line at a time and the output written in
+    # batches, so neither is ever held in memory whole
+    with open(args.script, 'r', encoding='utf-8') as source:
+        out = sys.stdout if to_stdout else open(out_path, 'w', encoding='utf-8')
+        map_out = open(map_path, 'wb') if map_path else None
+        try:
+            count = transpiler.transpile_stream(source, out, map_out)
+        finally:
+            if not to_stdout:
+                out.close()
+            if map_out is not None:
+                map_out.close()
+    if not to_stdout:
+        print(f"✅ Wrote {count} lines to {out_path}" + (f" (source map: {map_path})" if map_path else ""))
+
+def cache_command(argv):
+    """easypy cache info|clear: inspect or empty the `disk cache` store"""
+    parser = argparse.ArgumentParser(prog='easypy cache', description='Manage results saved by `disk cache`')
+    parser.add_argument('action', choices=['info', 'clear'])
+    parser.add_argument('--dir', help='Store directory (default: $EASYPY_CACHE_DIR or .easypy_cache)')
+    args = parser.parse_args(argv)
+
+    from .diskmemo import DiskStore, get_store
+    store = DiskStore(args.dir, get_store().max_bytes) if args.dir else get_store()
+    if args.action == 'clear':
+        removed = store.clear()
+        print(f"🧹 Removed {removed} cached results from {store.directory}")
+    else:
+        info = store.info()
+        print(f"📦 {info['directory']}: {info['entries']} results, "
+              f"{info['bytes'] / 2**20:.1f} MB of {info['max_bytes'] / 2**20:.0f} MB")
+
+def _create_profiler(filename, script, profile, memprofile, memprofile_interval,
+                     code_filename=None, line_map=None):
+    """Profiler requested on the command line, if any"""
+    if memprofile:
+        from .profiler import MemoryProfiler
+        return MemoryProfiler(filename, script, code_filename, line_map, interval=memprofile_interval)
+    if profile:
+        from .profiler import LineProfiler
+        return LineProfiler(filename, script, code_filename, line_map)
+    return None
+
+def run_file(filename, debug=False, use_transpiler=True, profile=False, profile_output=None,
+             memprofile=False, memprofile_interval=None, use_cache=True, passes=(),
+             run_async=False):
+    """Run an Easypy script file
+
+    Transpiled scripts are cached in __easypycache__ next to the script
+    (see cache.py) unless use_cache is False. passes names the optimizer
+    passes (optimizer.PASSES) to run over the transpiled code.
+
+    A script with top-level `await`, or any script when run_async is True,
+    runs on an event loop (aio.py) instead of a plain exec().
+
+    With profile=True the run is timed per .ep line; with memprofile=True its
+    allocations are traced per .ep line instead, snapshotting every
+    memprofile_interval seconds if given. The table is printed at the end and
+    the results written to profile_output (JSON, or pstats for a time profile
+    saved to .prof / .pstats), defaulting to <script>.profile.json or
+    <script>.memprofile.json.
+    """
     if not os.path.exists(filename):
         print(f"❌ Error: File '{filename}' not found!")
         sys.exit(1)
@@ -317,20 +451,55 @@ def run_file(filename, debug=False, use_transpiler=True):
             print(f"📄 Running: {filename}\n")
         
         if use_transpiler:
-            from .transpiler import EasypyTranspiler
-            transpiler = EasypyTranspiler()
-            py_code = transpiler.transpile(script)
+            from . import cache
+            # Code is compiled under the .ep path with .ep line numbers, so
+            # tracebacks and profilers need no source map lookup
+            options = "passes=" + ",".join(passes)
+            cached = cache.load(filename, script, filename, options) if use_cache else None
+            if cached is not None:
+                py_code, code, source_map = cached
+            else:
+                from .transpiler import EasypyTranspiler
+                transpiler = EasypyTranspiler()
+                py_code = transpiler.transpile(script)
+                source_map = transpiler.source_map
+                code = None
             sys.path.append(os.getcwd())
+            # `use foo` finds foo.ep beside the script, like sibling .py imports
+            script_dir = os.path.dirname(os.path.abspath(filename))
+            if script_dir not in sys.path:
+                sys.path.append(script_dir)
+            from .importer import install
+            install(passes)
+            profiler = _create_profiler(filename, script, profile, memprofile, memprofile_interval, filename)
             
             try:
-                exec(py_code, {'__name__': '__main__', '__file__': filename})
+                if code is None:
+                    tree = transpiler.python_to_ast(py_code, script, filename)
+                    if passes:
+                        from .optimizer import optimize
+                        tree = optimize(tree, passes)
+                    import ast
+                    code = compile(tree, filename, 'exec', flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+                    if use_cache:
+                        cache.store(filename, script, filename, py_code, code, source_map, options)
+                namespace = {'__name__': '__main__', '__file__': filename}
+                execute = exec
+                if run_async or code.co_flags & _CO_COROUTINE:
+                    from .aio import run_code as execute
+                if profiler is not None:
+                    profiler.run(code, namespace, execute)
+                else:
+                    execute(code, namespace)
+                if 'easypy_lang.scheduler' in sys.modules:
+                    # Jobs from `every` / `at` keep the script alive
+                    from .scheduler import run_until_done
+                    run_until_done()
             except SyntaxError as e:
-                # SyntaxError has its own attributes for line info
-                error_line_py = e.lineno
-                mapped_line = transpiler.source_map.get(error_line_py, "Unknown")
+                # Raised against the .ep line by python_to_ast or compile()
                 print("\n" + "="*40)
                 print(f"🔥 SYNTAX ERROR in '{filename}'")
-                print(f"📍 Original Line: {mapped_line}  (Internal Py Line: {error_line_py})")
+                print(f"📍 Original Line: {e.lineno or 'Unknown'}")
                 print(f"❌ Error: {e.msg}")
                 print("="*40 + "\n")
                 if debug: 
@@ -338,28 +507,41 @@ def run_file(filename, debug=False, use_transpiler=True):
                     traceback.print_exc()
                 sys.exit(1)
             except Exception as e:
-                # DEBUGGING LIMITATION FIX: Source Mapping
                 import traceback
                 _, _, tb = sys.exc_info()
                 
-                # Walk trace to find the exec frame
-                error_frame = traceback.extract_tb(tb)[-1]
-                error_line_py = error_frame.lineno
-                
-                # Map back to .ep file
-                mapped_line = transpiler.source_map.get(error_line_py, "Unknown")
+                # Innermost frame of the script itself, already on .ep lines
+                script_frames = [frame for frame in traceback.extract_tb(tb) if frame.filename == filename]
+                error_line = script_frames[-1].lineno if script_frames else "Unknown"
                 
                 print("\n" + "="*40)
                 print(f"🔥 RUNTIME ERROR in '{filename}'")
-                print(f"📍 Original Line: {mapped_line}  (Internal Py Line: {error_line_py})")
+                print(f"📍 Original Line: {error_line}")
                 print(f"❌ Error: {e}")
                 print("="*40 + "\n")
                 if debug: traceback.print_exc()
                 sys.exit(1)
 
         else:
+            from .engine import EasypyEngine
             engine = EasypyEngine(debug=debug)
-            engine.execute(script)
+            profiler = _create_profiler(filename, script, profile, memprofile, memprofile_interval)
+            if profiler is not None:
+                engine.profiler = profiler
+                profiler.start()
+                try:
+                    engine.execute(script)
+                finally:
+                    profiler.stop()
+            else:
+                engine.execute(script)
+        
+        if profiler is not None:
+            profiler.print_report()
+            default_output = f"{filename}.memprofile.json" if memprofile else f"{filename}.profile.json"
+            output = profile_output or default_output
+            profiler.dump(output)
+            print(f"📊 Profile written to {output}")
         
         console = _get_console()
         if console:
@@ -376,6 +558,17 @@ def run_file(filename, debug=False, use_transpiler=True):
 
 def main():
     """Main CLI entry point"""
+    # Commands with options of their own
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        build_command(sys.argv[2:])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "transpile":
+        transpile_command(sys.argv[2:])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "cache":
+        cache_command(sys.argv[2:])
+        sys.exit(0)
+    
     parser = argparse.ArgumentParser(
         description='🌟 Easypy Language - The Easiest Language for Everyone',
         add_help=False
@@ -388,6 +581,18 @@ def main():
     parser.add_argument('--interactive', '-i', action='store_true', help='Interactive mode')
     parser.add_argument('--debug', action='store_true', help='Debug mode')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    profiling = parser.add_mutually_exclusive_group()
+    profiling.add_argument('--profile', action='store_true', help='Report time spent per .ep line')
+    profiling.add_argument('--memprofile', action='store_true', help='Report memory allocated per .ep line')
+    parser.add_argument('--profile-output', dest='profile_output', help='Profile file (.json or .prof)')
+    parser.add_argument('-O', action='store_true', dest='optimize', help='Optimize the transpiled code')
+    parser.add_argument('--passes', help='Optimization passes to run with -O (comma separated)')
+    parser.add_argument('--no-cache', action='store_true', dest='no_cache',
+                        help='Always transpile, ignoring __easypycache__')
+    parser.add_argument('--async', action='store_true', dest='run_async',
+                        help='Give the script an event loop and finish its pending tasks')
+    parser.add_argument('--memprofile-interval', dest='memprofile_interval', type=float,
+                        help='Seconds between memory snapshots')
     
     args = parser.parse_args()
     
@@ -407,6 +612,15 @@ def main():
         run_interactive()
         sys.exit(0)
     
+    passes = ()
+    if args.optimize or args.passes:
+        from .optimizer import parse_passes
+        try:
+            passes = parse_passes(args.passes)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+    
     if args.script:
         # Handle commands disguised as scripts
         cmd = args.script.lower()
@@ -438,7 +652,10 @@ def main():
             run_file(args.script, debug=args.debug, use_transpiler=True)
             sys.exit(0)
 
-        run_file(args.script, debug=args.debug, use_transpiler=True)
+        run_file(args.script, debug=args.debug, use_transpiler=True,
+                 profile=args.profile, profile_output=args.profile_output,
+                 memprofile=args.memprofile, memprofile_interval=args.memprofile_interval,
+                 use_cache=not args.no_cache, passes=passes, run_async=args.run_async)
         sys.exit(0)
 
 if __name__ == '__main__':
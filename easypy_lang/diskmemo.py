@@ -0,0 +1,289 @@
+"""
+Easypy Disk Memo
+Results of `disk cache` calls kept in .easypy_cache so later runs can reuse them
+"""
+
+import functools
+import hashlib
+import io
+import os
+import pickle
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CACHE_DIR = ".easypy_cache"
+DEFAULT_MAX_MB = 512
+ENTRY_SUFFIX = ".pkl"
+_UNSAFE_NAME_RE = re.compile(r'[^\w.-]+')
+
+
+class DiskStore:
+    """Pickled results under directory/<function>/<argument hash>.pkl.
+
+    Each function gets a directory named after it and a hash of its code,
+    so editing a function starts it a fresh cache and clear(namespace)
+    drops one function's results. When the entries pass max_bytes, the
+    least recently used ones are deleted (a hit refreshes an entry's
+    mtime) until the store is back under 90% of the limit. Writes go
+    through a temporary file and os.replace, so concurrent runs never see
+    a partial entry.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes on disk, found by a scan on the first write
+        self._total: Optional[int] = None
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.directory, namespace, key + ENTRY_SUFFIX)
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        path = self._path(namespace, key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except Exception:
+            # Truncated, or pickled by code that no longer exists
+            self._remove(path)
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, value
+
+    def put(self, namespace: str, key: str, value: Any) -> bool:
+        """Store value; False when it cannot be pickled or written"""
+        try:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        path = self._path(namespace, key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return False
+
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+        return True
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every entry"""
+        entries = []
+        try:
+            namespaces = list(os.scandir(self.directory))
+        except OSError:
+            return entries
+        for namespace in namespaces:
+            if not namespace.is_dir():
+                continue
+            try:
+                files = list(os.scandir(namespace.path))
+            except OSError:
+                continue
+            for entry in files:
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._total = total
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Delete one function's entries, or all of them; returns how many"""
+        removed = 0
+        for _, _, path in self._entries():
+            if namespace is None or os.path.basename(os.path.dirname(path)) == namespace:
+                self._remove(path)
+                removed += 1
+        try:
+            directories = [entry.path for entry in os.scandir(self.directory) if entry.is_dir()
+                           and (namespace is None or entry.name == namespace)]
+        except OSError:
+            directories = []
+        for path in directories:
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._total = None
+        return removed
+
+    def info(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_store: Optional[DiskStore] = None
+
+
+def get_store() -> DiskStore:
+    """The process-wide store: EASYPY_CACHE_DIR (default .easypy_cache), EASYPY_CACHE_MAX_MB"""
+    global _store
+    if _store is None:
+        directory = os.environ.get("EASYPY_CACHE_DIR") or CACHE_DIR
+        max_mb = float(os.environ.get("EASYPY_CACHE_MAX_MB") or DEFAULT_MAX_MB)
+        _store = DiskStore(directory, int(max_mb * 1024 * 1024))
+    return _store
+
+
+def _code_digest(code, digest) -> None:
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _code_digest(const, digest)
+        elif isinstance(const, frozenset):
+            # Set order follows string hashing, which differs between runs
+            digest.update(repr(sorted(map(repr, const))).encode())
+        else:
+            digest.update(repr(const).encode())
+
+
+_namespaces: Dict[Tuple[Any, Any], str] = {}
+
+
+def _namespace(func: Callable) -> str:
+    """Directory name for a function: its name plus a hash of what it is and does"""
+    target = getattr(func, '__func__', func)
+    owner = getattr(func, '__self__', None)
+    cache_key = (target, type(owner))
+    namespace = _namespaces.get(cache_key)
+    if namespace is None:
+        namespace = _namespaces[cache_key] = _make_namespace(target, owner)
+    return namespace
+
+
+def _make_namespace(target: Callable, owner: Any) -> str:
+    if owner is not None and not isinstance(owner, type(os)):
+        name = f"{type(owner).__module__}.{type(owner).__qualname__}.{target.__name__}"
+    else:
+        name = f"{getattr(target, '__module__', None)}.{getattr(target, '__qualname__', repr(target))}"
+
+    digest = hashlib.sha256(name.encode())
+    code = getattr(target, '__code__', None)
+    if code is not None:
+        digest.update(os.path.abspath(code.co_filename).encode())
+        _code_digest(code, digest)
+    short_name = _UNSAFE_NAME_RE.sub('_', getattr(target, '__qualname__', 'call'))[:40]
+    return f"{short_name}-{digest.hexdigest()[:16]}"
+
+
+def _file_state(value: str) -> Optional[Tuple[int, int]]:
+    if len(value) > 4096 or '\n' in value or '\0' in value:
+        return None
+    try:
+        stat = os.stat(value)
+    except (OSError, ValueError):
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _KeyPickler(pickle.Pickler):
+    """Pickles classes by name, so instances of classes defined in a script
+    (which pickle cannot look up by reference) can still be hashed; a key
+    is never unpickled"""
+
+    def persistent_id(self, obj):
+        if isinstance(obj, type):
+            return f"{obj.__module__}.{obj.__qualname__}"
+        return None
+
+
+def _arguments_key(args: tuple, kwargs: dict, owner: Any = None) -> str:
+    """Hash of the arguments and of a bound method's owner, as it is now;
+    a path to an existing file also hashes its size and mtime"""
+    files = [(i, _file_state(arg)) for i, arg in enumerate(args) if isinstance(arg, str)]
+    files += [(name, _file_state(arg)) for name, arg in kwargs.items() if isinstance(arg, str)]
+    files = [(where, state) for where, state in files if state is not None]
+    buffer = io.BytesIO()
+    _KeyPickler(buffer, 4).dump((owner, args, sorted(kwargs.items()), files))
+    return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+
+def disk_cache(func: Callable) -> Callable:
+    """Reuse func's results across runs, keyed by its code and arguments.
+
+    Used as `@disk_cache` on a definition, or as disk_cache(web.get)(url)
+    for a single call. A bound method's result also depends on its object,
+    so the object's pickled state is part of the key: `a.scaled(2)` and
+    `b.scaled(2)` are cached apart. Calls whose arguments, object or
+    result cannot be pickled simply run uncached. The wrapper has stats() with this run's hits and
+    misses, and clear(), which deletes the function's stored results.
+    """
+    namespace = _namespace(func)
+    owner = getattr(func, '__self__', None)
+    if isinstance(owner, type(os)):
+        # A module's functions are keyed by their code alone
+        owner = None
+    counts = {"hits": 0, "misses": 0}
+
+    @functools.wraps(func)
+    def cached(*args, **kwargs):
+        try:
+            key = _arguments_key(args, kwargs, owner)
+        except Exception:
+            return func(*args, **kwargs)
+        store = get_store()
+        found, value = store.get(namespace, key)
+        if found:
+            counts["hits"] += 1
+            return value
+        counts["misses"] += 1
+        value = func(*args, **kwargs)
+        store.put(namespace, key, value)
+        return value
+
+    def stats() -> Dict[str, Any]:
+        return dict(counts, namespace=namespace)
+
+    def clear() -> int:
+        return get_store().clear(namespace)
+
+    cached.stats = stats
+    cached.clear = clear
+    return cached
@@ -8,27 +8,25 @@ import os
 import json
 import sys
 from typing import Any, Dict, List, Optional, Tuple
-import subprocess
-from datetime import datetime
-from .modules import (
-    FileModule, APIModule, DataModule, MLModule, MathModule, StringModule, WebModule,
-    DiscordBotModule, AIChatModule, VizModule, GUIModule, ImageModule, AudioModule,
-    SecurityModule, ScraperModule, MobileModule, NLPModule, DevOpsModule,
-    FinanceModule, BlockchainModule, RoboticsModule, IoTModule, ScienceModule,
-    VisionModule, CloudModule
-)
+from .ir import Compiler, compile_expression
+from .scopes import Scope
+from .streams import chunk, take
+from .values import parse_value, smart_split
 
 class EasypyEngine:
     """Advanced Easypy Language Engine"""
     
     def __init__(self, debug=False, context=None):
-        self.vars = {}
+        self.vars = Scope()
+        self.compiler = Compiler(self.vars.table)
         self.functions = {}
         self.global_vars = {}
         self.debug = debug
         self.line_num = 0
         self.imported_modules = {}
         self.context = context or {}
+        # Optional profiler (profiler.py) that runs and measures each instruction
+        self.profiler = None
         self.register_builtins()
         self.register_modules()
     
@@ -62,42 +60,52 @@ class EasypyEngine:
             'pip_list': self.builtin_pip_list,
             'banner': self.builtin_banner,
             'style': self.builtin_style,
+            'map': self.builtin_map,
+            'filter': self.builtin_filter,
+            'take': self.builtin_take,
+            'enumerate': self.builtin_enumerate,
+            'zip': self.builtin_zip,
+            'chunk': self.builtin_chunk,
         })
     
     def register_modules(self):
         """Register available modules"""
+        # Module name -> class in modules.py, instantiated by `use`
         self.available_modules = {
-            'file': FileModule(),
-            'api': APIModule(),
-            'data': DataModule(),
-            'ml': MLModule(),
-            'math': MathModule(),
-            'web': WebModule(),
-            'string': StringModule(),
-            'discord_bot': DiscordBotModule(),
-            'ai_chat': AIChatModule(),
-            'viz': VizModule(),
-            'gui': GUIModule(),
-            'image': ImageModule(),
-            'audio': AudioModule(),
-            'security': SecurityModule(),
-            'scraper': ScraperModule(),
-            'mobile': MobileModule(),
-            'nlp': NLPModule(),
-            'devops': DevOpsModule(),
-            'finance': FinanceModule(),
-            'blockchain': BlockchainModule(),
-            'robot': RoboticsModule(),
-            'iot': IoTModule(),
-            'science': ScienceModule(),
-            'vision': VisionModule(),
-            'cloud': CloudModule(),
+            'file': 'FileModule',
+            'api': 'APIModule',
+            'data': 'DataModule',
+            'ml': 'MLModule',
+            'math': 'MathModule',
+            'web': 'WebModule',
+            'string': 'StringModule',
+            'discord_bot': 'DiscordBotModule',
+            'ai_chat': 'AIChatModule',
+            'viz': 'VizModule',
+            'gui': 'GUIModule',
+            'image': 'ImageModule',
+            'audio': 'AudioModule',
+            'security': 'SecurityModule',
+            'scraper': 'ScraperModule',
+            'mobile': 'MobileModule',
+            'nlp': 'NLPModule',
+            'devops': 'DevOpsModule',
+            'finance': 'FinanceModule',
+            'blockchain': 'BlockchainModule',
+            'robot': 'RoboticsModule',
+            'iot': 'IoTModule',
+            'science': 'ScienceModule',
+            'vision': 'VisionModule',
+            'cloud': 'CloudModule',
         }
 
     def _load_module(self, module_name):
         """Load a module into the current context"""
         if module_name in self.available_modules:
-            self.imported_modules[module_name] = self.available_modules[module_name]
+            if module_name not in self.imported_modules:
+                from . import modules
+                module_class = getattr(modules, self.available_modules[module_name])
+                self.imported_modules[module_name] = module_class()
             print(f"✓ Loaded module: {module_name}")
         else:
             print(f"✗ Module not found: {module_name}")
@@ -117,10 +125,7 @@ class EasypyEngine:
                     if isinstance(arg, str) and (arg.startswith('"') or arg.startswith("'")):
                         # String literal
                         val = arg.strip('"\'')
-                        # Interpolate
-                        for k, v in self.vars.items():
-                             val = val.replace(f"{{{k}}}", str(v))
-                        real_args.append(val)
+                        real_args.append(self.compiler.template(val).render(self.vars))
                     elif isinstance(arg, str) and arg in self.vars:
                         real_args.append(self.vars[arg])
                     elif isinstance(arg, str):
@@ -150,7 +155,7 @@ class EasypyEngine:
         return len(obj)
     
     def builtin_range(self, *args):
-        return list(range(*args))
+        return range(*args)
     
     def builtin_str(self, obj):
         return str(obj)
@@ -209,18 +214,51 @@ class EasypyEngine:
         return time.time()
     
     def builtin_now(self):
+        from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    # Streaming builtins return lazy iterators; sum, max, min, join and list
+    # consume them directly, so chains never build intermediate lists.
+    
+    def builtin_map(self, func, iterable):
+        return map(self._as_callable(func), iterable)
+    
+    def builtin_filter(self, func, iterable):
+        return filter(self._as_callable(func), iterable)
+    
+    def builtin_take(self, n, iterable):
+        return take(n, iterable)
+    
+    def builtin_enumerate(self, iterable, start=0):
+        return enumerate(iterable, int(start))
+    
+    def builtin_zip(self, *iterables):
+        return zip(*iterables)
+    
+    def builtin_chunk(self, size, iterable):
+        return chunk(size, iterable)
+    
+    def _as_callable(self, func):
+        """Accept a callable or the name of a registered function"""
+        if callable(func):
+            return func
+        if func in self.functions:
+            return self.functions[func]
+        raise RuntimeError(f"Unknown function: {func}")
+
     def builtin_pip_install(self, package_name):
         """Install a Python package using pip"""
+        import subprocess
         return subprocess.run([sys.executable, "-m", "pip", "install", str(package_name)], check=False).returncode == 0
 
     def builtin_pip_uninstall(self, package_name):
         """Uninstall a Python package using pip"""
+        import subprocess
         return subprocess.run([sys.executable, "-m", "pip", "uninstall", "-y", str(package_name)], check=False).returncode == 0
 
     def builtin_pip_list(self):
         """List installed Python packages"""
+        import subprocess
         result = subprocess.run([sys.executable, "-m", "pip", "list"], capture_output=True, text=True, check=False)
         return result.stdout
 
@@ -278,49 +316,7 @@ class EasypyEngine:
     
     def clean_val(self, val: str) -> Any:
         """Convert string to appropriate type"""
-        val = val.strip()
-        
-        if val.lower() == 'true':
-            return True
-        if val.lower() == 'false':
-            return False
-        if val.lower() in ['none', 'null', 'nil']:
-            return None
-        
-        if re.match(r'^-?\d+(\.\d+)?$', val):
-            return float(val) if '.' in val else int(val)
-        
-        if val.startswith('[') and val.endswith(']'):
-            try:
-                inner = val[1:-1].strip()
-                if not inner:
-                    return []
-                items = [self.clean_val(item.strip()) for item in self.smart_split(inner, ',')]
-                return items
-            except:
-                pass
-        
-        if val.startswith('{') and val.endswith('}'):
-            try:
-                inner = val[1:-1].strip()
-                if not inner:
-                    return {}
-                result = {}
-                for pair in self.smart_split(inner, ','):
-                    if ':' in pair:
-                        k, v = pair.split(':', 1)
-                        result[k.strip()] = self.clean_val(v.strip())
-                return result
-            except:
-                pass
-        
-        if (val.startswith('"') and val.endswith('"')) or (val.startswith("'") and val.endswith("'")):
-            return val[1:-1]
-        
-        if re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', val):
-            return val
-        
-        return val
+        return parse_value(val)
     
     def get_value(self, val: str) -> Any:
         """Get variable value or convert string"""
@@ -333,33 +329,11 @@ class EasypyEngine:
     
     def smart_split(self, text: str, delimiter: str) -> List[str]:
         """Split respecting brackets and quotes"""
-        result = []
-        current = ""
-        depth = 0
-        in_quote = False
-        quote_char = None
-        
-        for char in text:
-            if char in ('"', "'") and (not in_quote or quote_char == char):
-                in_quote = not in_quote
-                quote_char = char if in_quote else None
-                current += char
-            elif char in ('[', '{') and not in_quote:
-                depth += 1
-                current += char
-            elif char in (']', '}') and not in_quote:
-                depth -= 1
-                current += char
-            elif char == delimiter and depth == 0 and not in_quote:
-                result.append(current)
-                current = ""
-            else:
-                current += char
-        
-        if current:
-            result.append(current)
-        
-        return result
+        return smart_split(text, delimiter)
+    
+    def interpolate(self, text: str) -> str:
+        """Replace {var} placeholders with variable values"""
+        return self.compiler.template(text).render(self.vars, self.global_vars)
     
     # ============ EXPRESSION EVALUATION ============
     
@@ -367,57 +341,23 @@ class EasypyEngine:
         """Evaluate expressions with variables"""
         expr = expr.strip()
         
-        for var_name, var_val in self.vars.items():
-            expr = re.sub(r'\b' + re.escape(var_name) + r'\b', repr(var_val), expr)
-        
-        for var_name, var_val in self.global_vars.items():
-            expr = re.sub(r'\b' + re.escape(var_name) + r'\b', repr(var_val), expr)
-        
         try:
-            allowed_names = {
-                'True': True, 'False': False, 'None': None,
-                **{name: func for name, func in self.functions.items()}
-            }
-            result = eval(expr, {"__builtins__": {}}, allowed_names)
-            return result
+            code, names = compile_expression(expr)
+            namespace = {"__builtins__": {}}
+            for name in names:
+                if name in self.vars:
+                    namespace[name] = self.vars[name]
+                elif name in self.global_vars:
+                    namespace[name] = self.global_vars[name]
+                elif name in self.functions:
+                    namespace[name] = self.functions[name]
+            return eval(code, namespace)
         except Exception as e:
             raise RuntimeError(f"Evaluation error: {e}")
     
     def evaluate_condition(self, cond: str) -> bool:
         """Evaluate conditions"""
-        cond = cond.strip()
-        
-        if ' and ' in cond:
-            parts = cond.split(' and ')
-            return all(self.evaluate_condition(p.strip()) for p in parts)
-        
-        if ' or ' in cond:
-            parts = cond.split(' or ')
-            return any(self.evaluate_condition(p.strip()) for p in parts)
-        
-        if cond.startswith('not '):
-            return not self.evaluate_condition(cond[4:].strip())
-        
-        for op in ['==', '!=', '>=', '<=', '>', '<']:
-            if op in cond:
-                left_str, right_str = cond.split(op, 1)
-                left = self.get_value(left_str.strip())
-                right = self.get_value(right_str.strip())
-                
-                if op == '==':
-                    return left == right
-                elif op == '!=':
-                    return left != right
-                elif op == '>=':
-                    return left >= right
-                elif op == '<=':
-                    return left <= right
-                elif op == '>':
-                    return left > right
-                elif op == '<':
-                    return left < right
-        
-        return bool(self.get_value(cond))
+        return self.compiler.condition(cond).evaluate(self)
     
     # ============ FUNCTION HANDLING ============
     
@@ -432,13 +372,7 @@ class EasypyEngine:
                     arg = arg.strip()
                     # Handle string arguments with interpolation
                     if (arg.startswith('"') and arg.endswith('"')) or (arg.startswith("'") and arg.endswith("'")):
-                        string_val = arg[1:-1]
-                        # Replace variables in string
-                        for var_name, var_val in self.vars.items():
-                            string_val = string_val.replace(f'{{{var_name}}}', str(var_val))
-                        for var_name, var_val in self.global_vars.items():
-                            string_val = string_val.replace(f'{{{var_name}}}', str(var_val))
-                        args.append(string_val)
+                        args.append(self.interpolate(arg[1:-1]))
                     else:
                         args.append(self.get_value(arg))
             
@@ -452,115 +386,29 @@ class EasypyEngine:
     
     def execute(self, script: str) -> None:
         """Execute Easypy script"""
-        lines = script.split('\n')
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i].strip()
-            self.line_num = i + 1
-            
-            if not line or line.startswith('#'):
-                i += 1
-                continue
-            
+        profiler = self.profiler
+        for instr in self.compiler.script(script):
+            self.line_num = instr.line
             try:
-                # Use statements
-                if line.startswith('use '):
-                    module = line.replace('use ', '').strip().split()[0]
-                    self._load_module(module)
-                
-                # Variable assignment
-                elif '=' in line and not any(x in line for x in ['==', '!=', '>=', '<=', '--->']) and not line.startswith('if') and not line.startswith('else'):
-                    name, val = line.split('=', 1)
-                    self.vars[name.strip()] = self.get_value(val.strip())
-                
-                # If/Else
-                elif line.startswith('if ') and '--->' in line:
-                    condition = line.split('--->', 1)[0].replace('if ', '').strip()
-                    action = line.split('--->', 1)[1].strip()
-                    
-                    if self.evaluate_condition(condition):
-                        self.execute_action(action)
-                        i = self._skip_else_blocks(lines, i)
-                    else:
-                        i = self._handle_else_blocks(lines, i)
-                
-                # Loops
-                elif line.startswith('loop ') and '--->' in line:
-                    match = re.match(r'loop (\d+) times ---> (.*)', line)
-                    if match:
-                        count, action = int(match.group(1)), match.group(2).strip()
-                        for _ in range(count):
-                            self.execute_action(action)
-                
-                # While
-                elif line.startswith('while ') and '--->' in line:
-                    condition = line.split('--->', 1)[0].replace('while ', '').strip()
-                    action = line.split('--->', 1)[1].strip()
-                    iterations = 0
-                    while self.evaluate_condition(condition) and iterations < 10000:
-                        self.execute_action(action)
-                        iterations += 1
-                
-                # Function calls
-                elif '(' in line and ')' in line and '=' not in line:
-                    self.parse_function_call(line)
-                
+                if profiler is None:
+                    instr.run(self)
+                else:
+                    profiler.run_instruction(instr, self)
             except Exception as e:
                 print(f"❌ Error at line {self.line_num}: {e}")
                 if self.debug:
                     import traceback
                     traceback.print_exc()
-            
-            i += 1
     
     def execute_action(self, action: str) -> None:
         """Execute an action"""
-        action = action.strip()
-        
-        # Interpolate variables
-        for var_name, var_val in self.vars.items():
-            action = action.replace(f'{{{var_name}}}', str(var_val))
-        
-        for var_name, var_val in self.global_vars.items():
-            action = action.replace(f'{{{var_name}}}', str(var_val))
+        action = self.interpolate(action.strip())
         
         if '(' in action and ')' in action:
             self.parse_function_call(action)
         else:
             print(action)
     
-    def _skip_else_blocks(self, lines: List[str], current: int) -> int:
-        """Skip else/else if blocks"""
-        i = current + 1
-        while i < len(lines):
-            next_line = lines[i].strip()
-            if next_line.startswith('else if ') or next_line.startswith('else '):
-                i += 1
-            else:
-                return i - 1
-        return i - 1
-    
-    def _handle_else_blocks(self, lines: List[str], current: int) -> int:
-        """Handle else/else if blocks"""
-        i = current + 1
-        while i < len(lines):
-            next_line = lines[i].strip()
-            if next_line.startswith('else if ') and '--->' in next_line:
-                condition = next_line.split('--->', 1)[0].replace('else if ', '').strip()
-                action = next_line.split('--->', 1)[1].strip()
-                if self.evaluate_condition(condition):
-                    self.execute_action(action)
-                    return self._skip_else_blocks(lines, i)
-                i += 1
-            elif next_line.startswith('else ') and '--->' in next_line:
-                action = next_line.split('--->', 1)[1].strip()
-                self.execute_action(action)
-                return i
-            else:
-                return i - 1
-        return i - 1
-    
     def _load_module(self, module: str) -> None:
         """Load and register module functions"""
         if module == 'file':
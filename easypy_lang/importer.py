@@ -0,0 +1,125 @@
+"""
+Easypy Importer
+Import hook that lets `use foo` load foo.ep the way `import foo` loads foo.py
+"""
+
+import importlib.machinery
+import os
+import sys
+from typing import Dict, Optional, Sequence, Tuple
+
+from . import cache
+
+SOURCE_SUFFIXES = ['.ep', '.easy']
+
+
+class EasypyLoader:
+    """Runs one .ep module, reusing its compiled code from __easypycache__.
+
+    Entries are keyed by a hash of the source (cache.py), so an unchanged
+    module is never transpiled again and an edited one never runs stale.
+    `passes` are the optimizer passes applied to every imported module.
+    The loader and finder protocols are implemented directly; the
+    importlib.abc base classes would pull importlib.resources into startup.
+    """
+    passes: Tuple[str, ...] = ()
+
+    def __init__(self, fullname: str, path: str):
+        self.name = fullname
+        self.path = path
+
+    def get_filename(self, fullname: Optional[str] = None) -> str:
+        return self.path
+
+    def get_source(self, fullname: Optional[str] = None) -> str:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def get_code(self, fullname: Optional[str] = None):
+        source = self.get_source()
+        options = "passes=" + ",".join(self.passes)
+        cached = cache.load(self.path, source, self.path, options)
+        if cached is not None:
+            return cached[1]
+
+        from .transpiler import EasypyTranspiler
+        transpiler = EasypyTranspiler()
+        py_code = transpiler.transpile(source)
+        tree = transpiler.python_to_ast(py_code, source, self.path, importable=True)
+        if self.passes:
+            from .optimizer import optimize
+            tree = optimize(tree, self.passes)
+        code = compile(tree, self.path, 'exec')
+        cache.store(self.path, source, self.path, py_code, code, transpiler.source_map, options)
+        return code
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module) -> None:
+        exec(self.get_code(), module.__dict__)
+
+
+class EasypyFinder:
+    """Finds `name.ep` (or `.easy`), or a package directory holding `__init__.ep`, on the import path.
+
+    Each path entry is searched with a FileFinder that knows Python's own
+    suffixes as well as .ep, so the usual precedence holds: the first entry
+    with a match wins, and within a directory .py beats .ep. Only .ep
+    matches are answered here; everything else is left to the regular
+    PathFinder that follows, which also still handles namespace packages.
+    Directory listings are cached by the FileFinders, so the cost per import
+    is a set lookup per path entry.
+    """
+
+    def __init__(self):
+        loaders = [
+            (importlib.machinery.ExtensionFileLoader, importlib.machinery.EXTENSION_SUFFIXES),
+            (importlib.machinery.SourceFileLoader, importlib.machinery.SOURCE_SUFFIXES),
+            (importlib.machinery.SourcelessFileLoader, importlib.machinery.BYTECODE_SUFFIXES),
+            (EasypyLoader, SOURCE_SUFFIXES),
+        ]
+        self._loaders = loaders
+        self._finders: Dict[str, importlib.machinery.FileFinder] = {}
+
+    def _finder(self, entry: str) -> Optional[importlib.machinery.FileFinder]:
+        finder = self._finders.get(entry)
+        if finder is None:
+            directory = entry or os.getcwd()
+            if not os.path.isdir(directory):
+                return None
+            finder = self._finders[entry] = importlib.machinery.FileFinder(directory, *self._loaders)
+        return finder
+
+    def find_spec(self, fullname: str, path: Optional[Sequence[str]] = None, target=None):
+        for entry in (sys.path if path is None else path):
+            if not isinstance(entry, str):
+                continue
+            finder = self._finder(entry)
+            if finder is None:
+                continue
+            spec = finder.find_spec(fullname, target)
+            if spec is None or spec.loader is None:
+                # Nothing here, or only a namespace portion
+                continue
+            return spec if isinstance(spec.loader, EasypyLoader) else None
+        return None
+
+    def invalidate_caches(self) -> None:
+        self._finders.clear()
+
+
+def install(passes: Tuple[str, ...] = ()) -> EasypyFinder:
+    """Put the .ep finder ahead of the PathFinder once; later calls update the passes"""
+    EasypyLoader.passes = tuple(passes)
+    for finder in sys.meta_path:
+        if isinstance(finder, EasypyFinder):
+            return finder
+    finder = EasypyFinder()
+    position = len(sys.meta_path)
+    for index, existing in enumerate(sys.meta_path):
+        if existing is importlib.machinery.PathFinder:
+            position = index
+            break
+    sys.meta_path.insert(position, finder)
+    return finder
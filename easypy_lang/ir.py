@@ -0,0 +1,549 @@
+"""
+Easypy Engine IR
+Compiles engine scripts into cached lists of typed instructions
+"""
+
+import operator
+import re
+import types
+from functools import lru_cache
+from typing import Optional, Tuple
+from .scopes import UNSET, SlotTable
+from .values import parse_value, split_args
+
+_CALL_RE = re.compile(r'(\w+)\((.*)\)$')
+_NAME_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+_PLACEHOLDER_RE = re.compile(r'\{([^{}]*)\}')
+_LOOP_RE = re.compile(r'loop (\d+) times ---> (.*)')
+
+# Same cap the line interpreter has always used for `while ... ---> action`
+MAX_WHILE_ITERATIONS = 10000
+
+
+# ============ EXPRESSIONS ============
+
+def _referenced_names(code: types.CodeType) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _referenced_names(const)
+    return names
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expr: str) -> Tuple[types.CodeType, Tuple[str, ...]]:
+    """Compile an expression once; returns its code object and the names it reads"""
+    code = compile(expr, '<easypy-expr>', 'eval')
+    return code, tuple(sorted(_referenced_names(code)))
+
+
+# ============ TEMPLATES ============
+
+class Template:
+    """String split once into literal text and {name} placeholders.
+
+    Only placeholders that are identifiers get a slot; anything else in
+    braces, such as `{a: 1}`, can never name a variable and stays literal.
+    """
+    __slots__ = ('text', 'parts', 'tail')
+
+    def __init__(self, table: SlotTable, text: str):
+        self.text = text
+        parts = []
+        literal = ''
+        pos = 0
+        for match in _PLACEHOLDER_RE.finditer(text):
+            name = match.group(1)
+            literal += text[pos:match.start()]
+            if name.isidentifier():
+                parts.append((literal, table.slot_for(name), name))
+                literal = ''
+            else:
+                literal += match.group(0)
+            pos = match.end()
+        self.parts = tuple(parts)
+        self.tail = literal + text[pos:]
+
+    def render(self, scope, global_vars=None) -> str:
+        """Fill placeholders from the scope, then global_vars"""
+        if not self.parts:
+            return self.text
+        slots = scope.slots
+        count = len(slots)
+        out = []
+        for literal, slot, name in self.parts:
+            out.append(literal)
+            value = slots[slot] if slot < count else UNSET
+            if value is not UNSET:
+                out.append(str(value))
+            elif global_vars and name in global_vars:
+                out.append(str(global_vars[name]))
+            else:
+                out.append('{' + name + '}')
+        out.append(self.tail)
+        return ''.join(out)
+
+
+# ============ CONDITIONS ============
+
+class LiteralOperand:
+    """Operand that can only ever be a constant"""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def resolve(self, engine):
+        return self.value
+
+
+class FreshOperand:
+    """List or dict literal, parsed anew each time so callers may mutate it"""
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def resolve(self, engine):
+        return parse_value(self.text)
+
+
+class NameOperand:
+    """Bare word: a variable if one is set, otherwise the literal it spells"""
+    __slots__ = ('slot', 'name', 'fallback')
+
+    def __init__(self, table: SlotTable, name: str):
+        self.slot = table.slot_for(name)
+        self.name = name
+        self.fallback = parse_value(name)
+
+    def resolve(self, engine):
+        slots = engine.vars.slots
+        if self.slot < len(slots):
+            value = slots[self.slot]
+            if value is not UNSET:
+                return value
+        global_vars = engine.global_vars
+        if global_vars and self.name in global_vars:
+            return global_vars[self.name]
+        return self.fallback
+
+
+class CallOperand:
+    """Nested `name(args)`: called if the engine knows the function, else literal text"""
+    __slots__ = ('call', 'fallback')
+
+    def __init__(self, call, fallback):
+        self.call = call
+        self.fallback = fallback
+
+    def resolve(self, engine):
+        if self.call.func_name in engine.functions:
+            return self.call.run(engine)
+        return self.fallback.resolve(engine)
+
+
+def compile_operand(table: SlotTable, text: str, fresh: bool = False, calls: bool = False):
+    """Pre-classify an operand.
+
+    `fresh` re-parses container literals per use; `calls` lets the operand
+    be a nested function call, so lazy builtins can feed each other.
+    """
+    text = text.strip()
+    if _NAME_RE.match(text):
+        return NameOperand(table, text)
+    if calls and _CALL_RE.match(text):
+        return CallOperand(compile_call(table, text), compile_operand(table, text, fresh))
+    value = parse_value(text)
+    if fresh and isinstance(value, (list, dict)):
+        return FreshOperand(text)
+    return LiteralOperand(value)
+
+
+class AllCondition:
+    __slots__ = ('parts',)
+
+    def __init__(self, parts: Tuple):
+        self.parts = parts
+
+    def evaluate(self, engine) -> bool:
+        for part in self.parts:
+            if not part.evaluate(engine):
+                return False
+        return True
+
+
+class AnyCondition:
+    __slots__ = ('parts',)
+
+    def __init__(self, parts: Tuple):
+        self.parts = parts
+
+    def evaluate(self, engine) -> bool:
+        for part in self.parts:
+            if part.evaluate(engine):
+                return True
+        return False
+
+
+class NotCondition:
+    __slots__ = ('part',)
+
+    def __init__(self, part):
+        self.part = part
+
+    def evaluate(self, engine) -> bool:
+        return not self.part.evaluate(engine)
+
+
+class CompareCondition:
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def evaluate(self, engine) -> bool:
+        return self.op(self.left.resolve(engine), self.right.resolve(engine))
+
+
+class TruthCondition:
+    __slots__ = ('operand',)
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def evaluate(self, engine) -> bool:
+        return bool(self.operand.resolve(engine))
+
+
+# Checked in this order, so '>=' wins over '>' and so on
+_COMPARE_OPS = (
+    ('==', operator.eq), ('!=', operator.ne), ('>=', operator.ge),
+    ('<=', operator.le), ('>', operator.gt), ('<', operator.lt),
+)
+
+
+def compile_condition(table: SlotTable, cond: str):
+    """Compile a condition into a short-circuiting predicate tree"""
+    cond = cond.strip()
+
+    if ' and ' in cond:
+        return AllCondition(tuple(compile_condition(table, p.strip()) for p in cond.split(' and ')))
+
+    if ' or ' in cond:
+        return AnyCondition(tuple(compile_condition(table, p.strip()) for p in cond.split(' or ')))
+
+    if cond.startswith('not '):
+        return NotCondition(compile_condition(table, cond[4:].strip()))
+
+    for symbol, op in _COMPARE_OPS:
+        if symbol in cond:
+            left, right = cond.split(symbol, 1)
+            return CompareCondition(op, compile_operand(table, left), compile_operand(table, right))
+
+    return TruthCondition(compile_operand(table, cond))
+
+
+# ============ ACTIONS ============
+
+class StringArg:
+    """Quoted call argument, interpolated at call time"""
+    __slots__ = ('template',)
+
+    def __init__(self, table: SlotTable, text: str):
+        self.template = Template(table, text)
+
+    def resolve(self, engine):
+        return self.template.render(engine.vars, engine.global_vars)
+
+
+class ValueArg:
+    """Bare call argument: a variable or a literal"""
+    __slots__ = ('text', 'operand')
+
+    def __init__(self, table: SlotTable, text: str):
+        self.text = text
+        self.operand = compile_operand(table, text, fresh=True, calls=True)
+
+    def resolve(self, engine):
+        return self.operand.resolve(engine)
+
+
+class CallAction:
+    """Call a registered engine function with pre-split arguments"""
+    __slots__ = ('func_name', 'args')
+
+    def __init__(self, func_name: str, args: Tuple):
+        self.func_name = func_name
+        self.args = args
+
+    def run(self, engine):
+        args = [arg.resolve(engine) for arg in self.args]
+        func = engine.functions.get(self.func_name)
+        if func is None:
+            raise RuntimeError(f"Unknown function: {self.func_name}")
+        return func(*args)
+
+
+class PrintAction:
+    """Print an action that is plain text"""
+    __slots__ = ('template',)
+
+    def __init__(self, table: SlotTable, text: str):
+        self.template = Template(table, text)
+
+    def run(self, engine):
+        print(self.template.render(engine.vars, engine.global_vars))
+
+
+class DynamicAction:
+    """Action whose shape depends on interpolated values; parsed at run time"""
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def run(self, engine):
+        engine.execute_action(self.text)
+
+
+class NoAction:
+    """Call-shaped text the engine cannot call (e.g. `obj.method(x)`)"""
+    __slots__ = ()
+
+    def run(self, engine):
+        return None
+
+
+NO_ACTION = NoAction()
+
+
+def compile_call(table: SlotTable, text: str):
+    """Compile `name(args)` into a CallAction, or NO_ACTION if it is not one"""
+    match = _CALL_RE.match(text.strip())
+    if not match:
+        return NO_ACTION
+    func_name, args_str = match.groups()
+    args = []
+    if args_str.strip():
+        for arg in split_args(args_str):
+            arg = arg.strip()
+            if (arg.startswith('"') and arg.endswith('"')) or (arg.startswith("'") and arg.endswith("'")):
+                args.append(StringArg(table, arg[1:-1]))
+            else:
+                args.append(ValueArg(table, arg))
+    return CallAction(func_name, tuple(args))
+
+
+def compile_action(table: SlotTable, action: str):
+    """Compile the right-hand side of `--->`"""
+    action = action.strip()
+    if '(' in action and ')' in action:
+        call = compile_call(table, action)
+        # Interpolation runs over the whole action before it is parsed, so a
+        # placeholder outside a string literal can change the call itself.
+        if isinstance(call, CallAction) and any(
+                isinstance(arg, ValueArg) and '{' in arg.text for arg in call.args):
+            return DynamicAction(action)
+        if call is NO_ACTION and '{' in action:
+            return DynamicAction(action)
+        return call
+    return PrintAction(table, action)
+
+
+# ============ INSTRUCTIONS ============
+
+class Instruction:
+    """Base class for compiled statements"""
+    __slots__ = ('line',)
+
+    def run(self, engine) -> None:
+        raise NotImplementedError
+
+
+class UseInstr(Instruction):
+    __slots__ = ('text',)
+
+    def __init__(self, line: int, text: str):
+        self.line = line
+        self.text = text
+
+    def run(self, engine):
+        engine._load_module(self.text.replace('use ', '').strip().split()[0])
+
+
+class AssignInstr(Instruction):
+    __slots__ = ('slot', 'value')
+
+    def __init__(self, line: int, slot: int, value):
+        self.line = line
+        self.slot = slot
+        self.value = value
+
+    def run(self, engine):
+        engine.vars.store(self.slot, self.value.resolve(engine))
+
+
+class IfChainInstr(Instruction):
+    """An `if` line plus its `else if` / `else` lines, resolved at compile time"""
+    __slots__ = ('branches', 'else_action')
+
+    def __init__(self, line: int, branches: Tuple, else_action=None):
+        self.line = line
+        self.branches = branches
+        self.else_action = else_action
+
+    def run(self, engine):
+        for condition, action in self.branches:
+            if condition.evaluate(engine):
+                action.run(engine)
+                return
+        if self.else_action is not None:
+            self.else_action.run(engine)
+
+
+class LoopInstr(Instruction):
+    __slots__ = ('count', 'action')
+
+    def __init__(self, line: int, count: int, action):
+        self.line = line
+        self.count = count
+        self.action = action
+
+    def run(self, engine):
+        run = self.action.run
+        for _ in range(self.count):
+            run(engine)
+
+
+class WhileInstr(Instruction):
+    __slots__ = ('condition', 'action')
+
+    def __init__(self, line: int, condition, action):
+        self.line = line
+        self.condition = condition
+        self.action = action
+
+    def run(self, engine):
+        evaluate = self.condition.evaluate
+        run = self.action.run
+        iterations = 0
+        while evaluate(engine) and iterations < MAX_WHILE_ITERATIONS:
+            run(engine)
+            iterations += 1
+
+
+class CallInstr(Instruction):
+    __slots__ = ('call',)
+
+    def __init__(self, line: int, call: CallAction):
+        self.line = line
+        self.call = call
+
+    def run(self, engine):
+        self.call.run(engine)
+
+
+# ============ COMPILER ============
+
+def _is_else_line(line: str) -> bool:
+    return line.startswith('else if ') or line.startswith('else ')
+
+
+def _compile_if_chain(table: SlotTable, lines, i: int) -> Tuple[IfChainInstr, int]:
+    """Compile the `if` at lines[i] and return it with the index of its last else line"""
+    line = lines[i].strip()
+    condition = line.split('--->', 1)[0].replace('if ', '').strip()
+    branches = [(compile_condition(table, condition), compile_action(table, line.split('--->', 1)[1]))]
+    else_action = None
+    chain_open = True
+
+    j = i + 1
+    while j < len(lines) and _is_else_line(lines[j].strip()):
+        next_line = lines[j].strip()
+        if chain_open:
+            if next_line.startswith('else if ') and '--->' in next_line:
+                condition = next_line.split('--->', 1)[0].replace('else if ', '').strip()
+                branches.append((compile_condition(table, condition),
+                                 compile_action(table, next_line.split('--->', 1)[1])))
+            elif '--->' in next_line:
+                else_action = compile_action(table, next_line.split('--->', 1)[1])
+                chain_open = False
+            else:
+                chain_open = False
+        # Else lines past the end of the chain are no-ops on their own
+        j += 1
+
+    return IfChainInstr(i + 1, tuple(branches), else_action), j - 1
+
+
+def _compile_line(table: SlotTable, line: str, line_num: int) -> Optional[Instruction]:
+    if line.startswith('use '):
+        return UseInstr(line_num, line)
+
+    if '=' in line and not any(x in line for x in ['==', '!=', '>=', '<=', '--->']) \
+            and not line.startswith('if') and not line.startswith('else'):
+        name, val = line.split('=', 1)
+        return AssignInstr(line_num, table.slot_for(name.strip()),
+                           compile_operand(table, val.strip(), fresh=True, calls=True))
+
+    if line.startswith('loop ') and '--->' in line:
+        match = _LOOP_RE.match(line)
+        if match:
+            return LoopInstr(line_num, int(match.group(1)), compile_action(table, match.group(2)))
+        return None
+
+    if line.startswith('while ') and '--->' in line:
+        condition = line.split('--->', 1)[0].replace('while ', '').strip()
+        return WhileInstr(line_num, compile_condition(table, condition),
+                          compile_action(table, line.split('--->', 1)[1]))
+
+    if '(' in line and ')' in line and '=' not in line:
+        call = compile_call(table, line)
+        if call is not NO_ACTION:
+            return CallInstr(line_num, call)
+
+    return None
+
+
+def compile_script(table: SlotTable, script: str) -> Tuple[Instruction, ...]:
+    """Compile an engine script into a tuple of instructions"""
+    lines = script.split('\n')
+    program = []
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if not line or line.startswith('#'):
+            i += 1
+            continue
+
+        if line.startswith('if ') and '--->' in line:
+            instr, i = _compile_if_chain(table, lines, i)
+            program.append(instr)
+        else:
+            instr = _compile_line(table, line, i + 1)
+            if instr is not None:
+                program.append(instr)
+
+        i += 1
+
+    return tuple(program)
+
+
+class Compiler:
+    """Compiles one engine's scripts, conditions and templates against its slot table.
+
+    Results are cached by source text. Caches and slot numbers belong to
+    the engine, so both are freed with it and a fresh engine starts with
+    an empty table whatever other engines in the process have compiled.
+    """
+
+    def __init__(self, table: SlotTable):
+        self.table = table
+        self.script = lru_cache(maxsize=256)(lambda script: compile_script(table, script))
+        self.condition = lru_cache(maxsize=1024)(lambda cond: compile_condition(table, cond))
+        self.template = lru_cache(maxsize=1024)(lambda text: Template(table, text))
@@ -0,0 +1,94 @@
+"""
+Easypy Job Scopes
+Lets the body of an `every` / `at` job assign the variables around it
+"""
+
+import ast
+import re
+from typing import Dict, Iterator, List, Optional, Set
+
+# Job functions the transpiler generates for `every` and `at`
+_JOB_NAME_RE = re.compile(r'_ep_job_\d+$')
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda,
+           ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+def _scope_nodes(statements: List[ast.stmt]) -> Iterator[ast.AST]:
+    """Nodes of one scope's statements; nested scopes are yielded but not entered"""
+    stack = list(reversed(statements))
+    while stack:
+        node = stack.pop()
+        yield node
+        if not isinstance(node, _SCOPES):
+            stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+
+def _bound_names(statements: List[ast.stmt]) -> Dict[str, None]:
+    """Names a scope binds, in first-binding order"""
+    names: Dict[str, None] = {}
+    for node in _scope_nodes(statements):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names[node.id] = None
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names[node.name] = None
+        elif isinstance(node, ast.alias):
+            names[(node.asname or node.name).split('.')[0]] = None
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names[node.name] = None
+    return names
+
+
+def _declared(statements: List[ast.stmt], kind: type) -> Set[str]:
+    return {name for node in _scope_nodes(statements) if isinstance(node, kind) for name in node.names}
+
+
+def _arguments(node: ast.FunctionDef) -> Set[str]:
+    args = node.args
+    names = {arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs}
+    names.update(arg.arg for arg in (args.vararg, args.kwarg) if arg is not None)
+    return names
+
+
+def _declare(job: ast.FunctionDef, enclosing_locals: Optional[Set[str]], enclosing_globals: Set[str]) -> None:
+    already = _declared(job.body, ast.Global) | _declared(job.body, ast.Nonlocal)
+    names = [name for name in _bound_names(job.body) if name not in already]
+    if enclosing_locals is None:
+        global_names, nonlocal_names = names, []
+    else:
+        global_names = [name for name in names if name in enclosing_globals]
+        nonlocal_names = [name for name in names if name in enclosing_locals]
+    declarations = []
+    if global_names:
+        declarations.append(ast.Global(names=global_names))
+    if nonlocal_names:
+        declarations.append(ast.Nonlocal(names=nonlocal_names))
+    for declaration in declarations:
+        ast.copy_location(declaration, job.body[0])
+    job.body[:0] = declarations
+
+
+def _visit(statements: List[ast.stmt], enclosing_locals: Optional[Set[str]],
+           enclosing_globals: Set[str], in_class: bool = False) -> None:
+    for node in _scope_nodes(statements):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not in_class and _JOB_NAME_RE.match(node.name):
+                _declare(node, enclosing_locals, enclosing_globals)
+            globals_here = _declared(node.body, ast.Global)
+            locals_here = (set(_bound_names(node.body)) | _arguments(node)) - globals_here
+            _visit(node.body, locals_here, globals_here)
+        elif isinstance(node, ast.ClassDef):
+            _visit(node.body, enclosing_locals, enclosing_globals, in_class=True)
+
+
+def declare_job_names(tree: ast.Module) -> ast.Module:
+    """Declare the names each job function assigns as the enclosing scope's.
+
+    A job body stands where the `while true { ...; sleep(60) }` loop it
+    replaces would be, so `count = count + 1` in it must update the
+    script's `count`. At module level every name the job binds is
+    declared `global`. Inside a function, names the function binds become
+    `nonlocal` (or `global` where the function declared them so); other
+    names stay local to the job.
+    """
+    _visit(tree.body, None, set())
+    return tree
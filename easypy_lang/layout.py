@@ -0,0 +1,252 @@
+"""
+Easypy Class Layout
+Gives classes whose fields are declared with `var` a __slots__ layout
+"""
+
+import ast
+from typing import Dict, List, Optional, Set
+
+# Names whose use means attributes may be set, read or listed by name
+_DYNAMIC_NAMES = {'setattr', 'delattr', 'vars', '__dict__'}
+
+
+class _AttributeUse(ast.NodeVisitor):
+    """Which attributes the module assigns, and where.
+
+    `self.x = ...` inside a method is charged to the enclosing class, and
+    `p.x = ...` to class C when every binding of p is `p = C(...)` with C
+    a class of this module; any other attribute assignment could target an
+    instance of any class. It also notes which classes' instances may be
+    seen by code this analysis cannot read: an instance that is returned,
+    passed to a call or stored anywhere but a plain name escapes.
+    """
+
+    def __init__(self):
+        self.by_class: Dict[ast.ClassDef, Set[str]] = {}
+        self.by_name: Dict[str, Set[str]] = {}
+        self.anywhere: Set[str] = set()
+        self.constructed: Dict[str, Set[str]] = {}
+        self.rebound: Set[str] = set()
+        self._constructions: Set[int] = set()
+        self.class_uses: Set[tuple] = set()
+        self.bases: Set[str] = set()
+        self.class_names: Set[str] = set()
+        # Callees whose result is used other than by `name = callee(...)`
+        self.escaping_calls: Set[str] = set()
+        # Names loaded other than as the object of an attribute
+        self.loose_names: Set[str] = set()
+        # Classes whose methods hand `self` on
+        self.escaping_self: Set[ast.ClassDef] = set()
+        self._bound_calls: Set[int] = set()
+        self._attribute_bases: Set[int] = set()
+        self.dynamic = False
+        self._classes: List[ast.ClassDef] = []
+
+    def visit_ClassDef(self, node):
+        self.class_names.add(node.name)
+        for base in node.bases:
+            if isinstance(base, ast.Name):
+                self.bases.add(base.id)
+            elif isinstance(base, ast.Attribute):
+                self.bases.add(base.attr)
+        self._classes.append(node)
+        self.generic_visit(node)
+        self._classes.pop()
+
+    def visit_Attribute(self, node):
+        if node.attr in _DYNAMIC_NAMES:
+            self.dynamic = True
+        if isinstance(node.ctx, (ast.Store, ast.Del)):
+            if self._classes and isinstance(node.value, ast.Name) and node.value.id == 'self':
+                self.by_class.setdefault(self._classes[-1], set()).add(node.attr)
+            elif isinstance(node.value, ast.Name):
+                self.by_name.setdefault(node.value.id, set()).add(node.attr)
+            else:
+                self.anywhere.add(node.attr)
+        # `Counter.count += 1` needs a class attribute as much as a read does
+        if isinstance(node.value, ast.Name):
+            self.class_uses.add((node.value.id, node.attr))
+        self._attribute_bases.add(id(node.value))
+        self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        if isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Name):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self.constructed.setdefault(target.id, set()).add(node.value.func.id)
+                    self._constructions.add(id(target))
+            if all(isinstance(target, ast.Name) for target in node.targets):
+                self._bound_calls.add(id(node.value))
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and id(node) not in self._bound_calls:
+            self.escaping_calls.add(node.func.id)
+        self.generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id in _DYNAMIC_NAMES:
+            self.dynamic = True
+        if not isinstance(node.ctx, ast.Load) and id(node) not in self._constructions:
+            self.rebound.add(node.id)
+        elif isinstance(node.ctx, ast.Load) and id(node) not in self._attribute_bases:
+            self.loose_names.add(node.id)
+            if node.id == 'self' and self._classes:
+                self.escaping_self.add(self._classes[-1])
+
+    def visit_arg(self, node):
+        self.rebound.add(node.arg)
+        self.generic_visit(node)
+
+    def stored_on(self, node: ast.ClassDef) -> Set[str]:
+        """Attributes that may be assigned on an instance of node"""
+        stored = set(self.anywhere) | self.by_class.get(node, set())
+        for name, attrs in self.by_name.items():
+            if name in self.class_names and name not in self.rebound and name not in self.constructed:
+                # Stored on a class object, not on instances
+                continue
+            classes = self.constructed.get(name)
+            # Only a name every binding of which builds another known class
+            # is certainly not an instance of node
+            if (name in self.rebound or classes is None or node.name in classes
+                    or not classes <= self.class_names):
+                stored |= attrs
+        return stored
+
+    def escapes(self, node: ast.ClassDef) -> bool:
+        """Whether an instance of node may reach code outside this analysis"""
+        if node.name in self.escaping_calls or node in self.escaping_self:
+            return True
+        return any(node.name in classes and name in self.loose_names
+                   for name, classes in self.constructed.items())
+
+
+def _field_assignments(node: ast.ClassDef, fields: List[str]) -> Optional[Dict[str, ast.Assign]]:
+    """The `name = value` statement of every field, or None if one is not that simple"""
+    found = {}
+    for statement in node.body:
+        if (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+                and isinstance(statement.targets[0], ast.Name)
+                and statement.targets[0].id in fields):
+            found[statement.targets[0].id] = statement
+    if set(found) != set(fields):
+        return None
+    return found
+
+
+def _class_bound_names(node: ast.ClassDef, skip: List[ast.stmt]) -> Set[str]:
+    names = set()
+    for statement in node.body:
+        if statement in skip:
+            continue
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(statement.name)
+        else:
+            for child in ast.walk(statement):
+                if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+                    names.add(child.id)
+    return names
+
+
+def _init_method(node: ast.ClassDef) -> Optional[ast.FunctionDef]:
+    inits = [s for s in node.body if isinstance(s, (ast.FunctionDef, ast.AsyncFunctionDef))
+             and s.name == '__init__']
+    if not inits:
+        return None
+    return inits[0]
+
+
+def _slot_class(node: ast.ClassDef, fields: List[str], use: _AttributeUse) -> bool:
+    # A subclass's own __init__ would skip the field initialization
+    if node.bases or node.keywords or node.decorator_list or node.name in use.bases:
+        return False
+    assignments = _field_assignments(node, fields)
+    if assignments is None:
+        return False
+    others = _class_bound_names(node, list(assignments.values()))
+    if '__slots__' in others or others & set(fields):
+        return False
+    # Every attribute that may land on an instance must have a slot, and the
+    # fields must not be used through the class itself
+    if not use.stored_on(node) <= set(fields):
+        return False
+    if any((node.name, field) in use.class_uses for field in fields):
+        return False
+    if use.escapes(node):
+        return False
+    defaults = {field: f"_ep_default_{field}" for field in fields}
+    if others & set(defaults.values()):
+        return False
+    init = _init_method(node)
+    if init is not None:
+        if (not isinstance(init, ast.FunctionDef) or len(init.args.posonlyargs + init.args.args) == 0
+                or sum(1 for s in node.body if getattr(s, 'name', None) == '__init__') > 1):
+            return False
+
+    first_field = assignments[fields[0]]
+    slots = ast.Assign(
+        targets=[ast.Name(id='__slots__', ctx=ast.Store())],
+        value=ast.Tuple(elts=[ast.Constant(value=field) for field in fields], ctx=ast.Load()),
+    )
+    ast.fix_missing_locations(ast.copy_location(slots, first_field))
+
+    if init is None:
+        init = ast.FunctionDef(
+            name='__init__',
+            args=ast.arguments(posonlyargs=[], args=[ast.arg(arg='self')], vararg=None,
+                               kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]),
+            body=[], decorator_list=[], returns=None, type_comment=None,
+        )
+        ast.fix_missing_locations(ast.copy_location(init, first_field))
+        node.body.insert(0, init)
+    self_name = (init.args.posonlyargs + init.args.args)[0].arg
+    initializers = []
+    for field in fields:
+        assignment = assignments[field]
+        # The default is still evaluated once, where the field was declared,
+        # and every instance starts out referring to that one object
+        assignment.targets = [ast.copy_location(ast.Name(id=defaults[field], ctx=ast.Store()),
+                                                assignment.targets[0])]
+        store = ast.Assign(
+            targets=[ast.Attribute(value=ast.Name(id=self_name, ctx=ast.Load()), attr=field, ctx=ast.Store())],
+            value=ast.Attribute(value=ast.Name(id=self_name, ctx=ast.Load()), attr=defaults[field],
+                                ctx=ast.Load()),
+        )
+        ast.fix_missing_locations(ast.copy_location(store, assignment))
+        initializers.append(store)
+    init.body[:0] = initializers
+
+    node.body.insert(0, slots)
+    return True
+
+
+def apply_slots(tree: ast.Module, class_fields: Dict[int, List[str]]) -> ast.Module:
+    """Give each class a __slots__ of its `var` fields, set in __init__.
+
+    class_fields maps the generated line of a `class` statement to the
+    names its body declared with `var` (or a type). A class is left as it
+    is when it has bases, subclasses, decorators or its own __slots__, when
+    a field is not a plain `name = value`, when the script could assign an
+    attribute that is not a field (setattr, vars or a non-field
+    `x.attr = ...` anywhere), when a field is used through the class
+    as `Class.field`, or when an instance may leave the script's sight:
+    returned, passed to a call, put in a container or handed on as `self`.
+    Modules that other code imports keep every class as it is (see
+    EasypyTranspiler.python_to_ast), since their importers are not seen.
+
+    Defaults keep their meaning: each is evaluated once, where it was
+    declared, into a class attribute `_ep_default_<field>`, and __init__
+    starts every instance off with that same object. A mutable default such
+    as `var items = []` is therefore still shared between instances, as it
+    is without slots, until an instance assigns its own value.
+    """
+    use = _AttributeUse()
+    use.visit(tree)
+    if use.dynamic:
+        return tree
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            fields = list(dict.fromkeys(class_fields.get(node.lineno, ())))
+            if fields:
+                _slot_class(node, fields, use)
+    return tree
@@ -0,0 +1,172 @@
+"""
+Easypy Lexer
+Single-pass tokenizer feeding the transpiler, with line and column positions
+"""
+
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Token kinds
+TEXT = 'TEXT'        # a run of code with no quotes, braces, semicolons or newlines
+STRING = 'STRING'    # a quoted literal, quotes included; may span lines
+LBRACE = 'LBRACE'
+RBRACE = 'RBRACE'
+SEMI = 'SEMI'
+NEWLINE = 'NEWLINE'
+
+_TOKEN_RE = re.compile(r'"[^"]*"?|\'[^\']*\'?|[{};\n]|[^"\'{};\n]+')
+_PUNCTUATION = {'{': LBRACE, '}': RBRACE, ';': SEMI, '\n': NEWLINE}
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    line: int    # 1-based line of the first character
+    col: int     # 0-based column of the first character
+
+
+class Lexer:
+    """Incremental tokenizer: feed() source in chunks of any size, then finish().
+
+    A string literal left open at the end of a chunk continues into the next
+    one; an unterminated literal runs to the end of the input.
+    """
+
+    def __init__(self):
+        self.line = 1
+        self.col = 0
+        # Open string literal carried across chunks: (quote, pieces, line, col)
+        self._open: Optional[Tuple[str, List[str], int, int]] = None
+
+    def _advance(self, text: str) -> None:
+        newlines = text.count('\n')
+        if newlines:
+            self.line += newlines
+            self.col = len(text) - text.rfind('\n') - 1
+        else:
+            self.col += len(text)
+
+    def feed(self, chunk: str) -> List[Token]:
+        tokens = []
+        pos = 0
+        if self._open is not None:
+            quote, pieces, line, col = self._open
+            end = chunk.find(quote)
+            if end == -1:
+                pieces.append(chunk)
+                self._advance(chunk)
+                return tokens
+            pieces.append(chunk[:end + 1])
+            self._advance(chunk[:end + 1])
+            tokens.append(Token(STRING, ''.join(pieces), line, col))
+            self._open = None
+            pos = end + 1
+
+        line = self.line
+        col = self.col
+        append = tokens.append
+        for match in _TOKEN_RE.finditer(chunk, pos):
+            text = match.group()
+            first = text[0]
+            if first == '\n':
+                append(Token(NEWLINE, text, line, col))
+                line += 1
+                col = 0
+            elif first == '"' or first == "'":
+                self.line = line
+                self.col = col
+                if len(text) == 1 or text[-1] != first:
+                    self._open = (first, [text], line, col)
+                    self._advance(text)
+                    return tokens
+                append(Token(STRING, text, line, col))
+                self._advance(text)
+                line = self.line
+                col = self.col
+            else:
+                append(Token(_PUNCTUATION.get(text, TEXT), text, line, col))
+                col += len(text)
+        self.line = line
+        self.col = col
+        return tokens
+
+    def finish(self) -> List[Token]:
+        if self._open is None:
+            return []
+        quote, pieces, line, col = self._open
+        self._open = None
+        return [Token(STRING, ''.join(pieces), line, col)]
+
+
+def tokenize(chunks: Iterable[str]) -> Iterator[Token]:
+    """Tokens of a source given as one string or as an iterable of chunks"""
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+    lexer = Lexer()
+    for chunk in chunks:
+        yield from lexer.feed(chunk)
+    yield from lexer.finish()
+
+
+def logical_lines(tokens: Iterable[Token]) -> Iterator[Tuple[int, str]]:
+    """Group tokens into the transpiler's lines, as (original line, text).
+
+    `{` ends a line, `}` stands on a line of its own and `;` separates
+    statements, so 'if (x) { print(y) }' yields 'if (x) {', ' print(y) '
+    and '}'. Newlines inside a line's text (including inside a string
+    literal) still split it, and each piece keeps its own line number.
+    Blank text before a `}` or `;` is dropped.
+
+    Pieces are yielded at each newline once the text they belong to is known
+    not to be blank, so only a run of blank lines is ever held back and
+    memory does not grow with the length of the source.
+    """
+    pending: List[str] = []
+    pending_line = 0
+    # The text being collected already had non-blank pieces yielded
+    committed = False
+
+    for token in tokens:
+        kind = token.kind
+        if kind == LBRACE:
+            pending.append('{')
+            text = ''.join(pending)
+            start = pending_line if len(pending) > 1 else token.line
+            pending = []
+            committed = False
+            for offset, piece in enumerate(text.split('\n')):
+                yield start + offset, piece
+        elif kind == RBRACE or kind == SEMI:
+            if pending:
+                text = ''.join(pending)
+                pending = []
+                if committed or text.strip():
+                    for offset, piece in enumerate(text.split('\n')):
+                        yield pending_line + offset, piece
+            committed = False
+            if kind == RBRACE:
+                yield token.line, '}'
+        elif kind == NEWLINE and pending:
+            text = ''.join(pending)
+            if committed or text.strip():
+                for offset, piece in enumerate(text.split('\n')):
+                    yield pending_line + offset, piece
+                # The empty piece after this newline is part of the same text
+                pending = ['']
+                pending_line = token.line + 1
+                committed = True
+            else:
+                pending = [text + '\n']
+        else:
+            if not pending:
+                pending_line = token.line
+            pending.append(token.text)
+
+    if pending:
+        text = ''.join(pending)
+        if committed or text.strip():
+            for offset, piece in enumerate(text.split('\n')):
+                yield pending_line + offset, piece
+            return
+    # Every line so far ended in a break, leaving one empty final line
+    yield None, ''
@@ -0,0 +1,104 @@
+"""
+Easypy Memo
+Bounded result caches behind `cached func`, with hit/miss counters
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Separates positional from keyword arguments in a cache key
+_KWARGS_MARK = object()
+
+
+def _stats(hits: int, misses: int, size: int, maxsize: Optional[int],
+           ttl: Optional[float], expired: int = 0) -> Dict[str, Any]:
+    return {"hits": hits, "misses": misses, "expired": expired,
+            "size": size, "maxsize": maxsize, "ttl": ttl}
+
+
+def _lru(func: Callable, size: Optional[int]) -> Callable:
+    """functools.lru_cache, which is implemented in C, with the memo API"""
+    cached = functools.lru_cache(maxsize=size)(func)
+
+    def stats() -> Dict[str, Any]:
+        info = cached.cache_info()
+        return _stats(info.hits, info.misses, info.currsize, info.maxsize, None)
+
+    cached.stats = stats
+    cached.clear = cached.cache_clear
+    return cached
+
+
+def _lru_ttl(func: Callable, size: Optional[int], ttl: float) -> Callable:
+    """LRU cache whose entries also expire `ttl` seconds after being stored"""
+    entries: "OrderedDict[Any, tuple]" = OrderedDict()
+    lock = threading.Lock()
+    counts = {"hits": 0, "misses": 0, "expired": 0}
+    clock = time.monotonic
+
+    @functools.wraps(func)
+    def cached(*args, **kwargs):
+        key = args
+        if kwargs:
+            key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+        now = clock()
+        with lock:
+            entry = entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    entries.move_to_end(key)
+                    counts["hits"] += 1
+                    return entry[1]
+                del entries[key]
+                counts["expired"] += 1
+            counts["misses"] += 1
+
+        # Called without the lock, so recursion and other threads proceed;
+        # two threads missing on one key both compute it
+        value = func(*args, **kwargs)
+        if size == 0:
+            return value
+        with lock:
+            entries[key] = (clock() + ttl, value)
+            entries.move_to_end(key)
+            if size is not None and len(entries) > size:
+                entries.popitem(last=False)
+        return value
+
+    def stats() -> Dict[str, Any]:
+        with lock:
+            return _stats(counts["hits"], counts["misses"], len(entries), size, ttl, counts["expired"])
+
+    def clear() -> None:
+        with lock:
+            entries.clear()
+            for name in counts:
+                counts[name] = 0
+
+    cached.stats = stats
+    cached.clear = clear
+    return cached
+
+
+def memo(func: Optional[Callable] = None, *, size: Optional[int] = 128,
+         ttl: Optional[float] = None) -> Callable:
+    """Memoize a function: `@memo`, `@memo()` or `@memo(size=256, ttl=60)`.
+
+    Keeps the results of the `size` most recently used argument tuples
+    (None for no bound); with `ttl`, a result is recomputed once it is
+    older than ttl seconds. Arguments must be hashable. The returned
+    function has stats(), a dict of hits, misses, expired, size, maxsize
+    and ttl, and clear(), which empties the cache and resets the counters.
+    """
+    if func is None:
+        return lambda f: memo(f, size=size, ttl=ttl)
+    if size is not None:
+        size = max(0, int(size))
+    if ttl is None:
+        return _lru(func, size)
+    if ttl <= 0:
+        raise ValueError("cached func ttl must be positive")
+    return _lru_ttl(func, size, float(ttl))
@@ -8,16 +8,82 @@ import os
 import time
 import json
 import threading
+from .memo import memo
+from .streams import chunk, read_lines, take
+from .typedlist import FloatList, IntList, json_default as _json_default
 
 # Global Aliases for Easypy -> Python compatibility
 true = True
 false = False
 null = None
 
+# Persistent memoization (diskmemo.py), imported on first use since it
+# brings in pickle and hashlib
+def disk_cache(func):
+    from .diskmemo import disk_cache as _disk_cache
+    return _disk_cache(func)
+
+# Runs `parallel for` loop bodies (parallel.py); concurrent.futures is
+# only imported by scripts that use one
+def parallel_map(body, items, mode="processes", workers=None):
+    from .parallel import parallel_map as _parallel_map
+    return _parallel_map(body, items, mode, workers)
+
+# Jobs of `every` and `at` statements (scheduler.py); the scheduler
+# thread starts with the first job
+def schedule_every(seconds, job, mode="inline"):
+    from .scheduler import schedule_every as _schedule_every
+    return _schedule_every(seconds, job, mode)
+
+def schedule_at(time_of_day, job, mode="inline"):
+    from .scheduler import schedule_at as _schedule_at
+    return _schedule_at(time_of_day, job, mode)
+
 # Built-in String Helpers
 def upper(s): return str(s).upper()
 def lower(s): return str(s).lower()
 
+# ==================== LAZY MODULES ====================
+class _LazyModule:
+    """Stands in for a module object until a script first uses it.
+
+    The implementation is constructed on the first attribute access, so a
+    script that never touches `gui` or `db` never builds them, and their
+    dependencies (tkinter, sqlite3, ...) are imported by the methods that
+    need them. Methods read once are cached on the proxy.
+    """
+
+    def __init__(self, name, factory):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+
+    def _resolve(self):
+        instance = self._instance
+        if instance is None:
+            instance = self._factory()
+            object.__setattr__(self, '_instance', instance)
+        return instance
+
+    def __getattr__(self, attr):
+        instance = self._resolve()
+        value = getattr(instance, attr)
+        if getattr(value, '__self__', None) is instance:
+            # Later calls find the bound method without reaching __getattr__
+            object.__setattr__(self, attr, value)
+        return value
+
+    def __setattr__(self, attr, value):
+        setattr(self._resolve(), attr, value)
+
+    def __dir__(self):
+        return dir(self._resolve())
+
+    def __repr__(self):
+        if self._instance is None:
+            return f"<easypy module {self._name!r} (not loaded)>"
+        return repr(self._instance)
+
 # ==================== GUI (Tkinter) ====================
 class _GUIImpl:
     def __init__(self):
@@ -66,7 +132,7 @@ class _GUIImpl:
         print(f"🖥️ Opening Window: {app.title()}")
         app.mainloop()
 
-gui = _GUIImpl()
+gui = _LazyModule('gui', _GUIImpl)
 
 
 # ==================== SYSTEM ====================
@@ -91,7 +157,7 @@ class _FileImpl:
         with open(path, "r", encoding='utf-8') as f:
             return f.read()
 
-file = _FileImpl()
+file = _LazyModule('file', _FileImpl)
 
 # ==================== WEB ====================
 class _WebImpl:
@@ -108,7 +174,7 @@ class _WebImpl:
             print("❌ Error: 'requests' module missing. Run: pip install requests")
             return None
 
-web = _WebImpl()
+web = _LazyModule('web', _WebImpl)
 
 # ==================== DISCORD (Simplified Sync Wrapper) ====================
 # Note: Real discord requires async. We will do a blocking runner for simplicity in v1 transpiler.
@@ -119,7 +185,7 @@ class _DiscordImpl:
         print(f"✓ Stored token: {token[:5]}...")
         return {"token": token}
 
-discord_bot = _DiscordImpl()
+discord_bot = _LazyModule('discord_bot', _DiscordImpl)
 
 # ==================== ML (Machine Learning - Sklearn Wrapper) ====================
 class _MLImpl:
@@ -157,7 +223,7 @@ class _SimpleModel:
             return None
         return self.model.predict([input_data])[0]
 
-ml = _MLImpl()
+ml = _LazyModule('ml', _MLImpl)
 
 # ==================== AI (Simple NLP/Chat) ====================
 class _AIImpl:
@@ -173,7 +239,7 @@ class _AIImpl:
                 return v
         return f"User asked: '{prompt}' (AI Backend not connected)"
 
-ai = _AIImpl()
+ai = _LazyModule('ai', _AIImpl)
 
 # ==================== GAME (Turtle Graphics) ====================
 class _GameImpl:
@@ -193,7 +259,7 @@ class _GameImpl:
         p.speed(0)
         return p
         
-game = _GameImpl()
+game = _LazyModule('game', _GameImpl)
 
 # Helper for implicit 'ml_classifier' in examples often seen
 def ml_classifier(): return ml.model("classifier")
@@ -213,7 +279,7 @@ class _DBImpl:
     def save_json(self, path, data):
         try:
             with open(path, 'w') as f:
-                json.dump(data, f, indent=4)
+                json.dump(data, f, indent=4, default=_json_default)
             print(f"✓ Data saved to {path}")
         except Exception as e:
             print(f"❌ Save JSON Failed: {e}")
@@ -245,7 +311,7 @@ class _SQLiteConn:
     def close(self):
         self.conn.close()
 
-db = _DBImpl()
+db = _LazyModule('db', _DBImpl)
 
 # ==================== DATE & TIME ====================
 class _DateImpl:
@@ -258,6 +324,6 @@ class _DateImpl:
     def timestamp(self):
         return time.time()
 
-datetime = _DateImpl()
+datetime = _LazyModule('datetime', _DateImpl)
 
 
@@ -0,0 +1,514 @@
+"""
+Easypy Optimizer
+AST optimization passes for transpiled scripts, enabled with `easypy -O`
+"""
+
+import ast
+import builtins
+import operator
+from typing import Dict, Iterable, List, Optional, Set
+
+# Easypy spellings of the Python constants, defined by modules_real
+_CONSTANT_NAMES = {'true': True, 'false': False, 'null': None}
+
+# Folded results larger than this stay as runtime expressions
+_MAX_FOLDED_SIZE = 4096
+
+_BINARY_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow, ast.LShift: operator.lshift, ast.RShift: operator.rshift,
+    ast.BitOr: operator.or_, ast.BitXor: operator.xor, ast.BitAnd: operator.and_,
+}
+_UNARY_OPS = {
+    ast.Not: operator.not_, ast.USub: operator.neg, ast.UAdd: operator.pos,
+    ast.Invert: operator.invert,
+}
+_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge, ast.Is: operator.is_, ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+
+# Builtins a hoisted loop may call: none of them can rebind a variable
+_PURE_BUILTINS = {
+    'abs', 'bool', 'dict', 'divmod', 'enumerate', 'float', 'int', 'isinstance', 'len',
+    'list', 'max', 'min', 'print', 'range', 'repr', 'round', 'set', 'sorted', 'str',
+    'sum', 'tuple', 'zip',
+}
+
+# try statements; `finalbody` is the only block they require besides `body`
+_TRY_NODES = (ast.Try, ast.TryStar) if hasattr(ast, 'TryStar') else (ast.Try,)
+
+# Scopes of their own; passes working on one scope don't descend into them
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda,
+           ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+# ============ ANALYSIS HELPERS ============
+
+def _bound_names(nodes: Iterable[ast.AST]) -> Set[str]:
+    """Names stored, deleted, imported, defined or declared global anywhere under nodes"""
+    names = set()
+    for root in nodes:
+        for node in ast.walk(root):
+            if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+                names.add(node.id)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.add(node.name)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                for alias in node.names:
+                    names.add((alias.asname or alias.name).split('.')[0])
+            elif isinstance(node, (ast.Global, ast.Nonlocal)):
+                names.update(node.names)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                names.add(node.name)
+            elif isinstance(node, ast.arg):
+                names.add(node.arg)
+    return names
+
+
+def _scalar_names(tree: ast.AST) -> Set[str]:
+    """Names whose every binding assigns a number, string, bool or None constant"""
+    scalar_targets = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Assign, ast.AugAssign)) and _is_scalar(node.value):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            scalar_targets.update(id(target) for target in targets if isinstance(target, ast.Name))
+    candidates, other = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if not isinstance(node.ctx, ast.Load):
+                (candidates if id(node) in scalar_targets else other).add(node.id)
+        # Parameters, imports, definitions and the like bind names to anything
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            other.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            other.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            other.update(node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            other.add(node.name)
+        elif isinstance(node, ast.arg):
+            other.add(node.arg)
+    return candidates - other
+
+
+def _is_scalar(value: ast.AST) -> bool:
+    return (isinstance(value, ast.Constant)
+            and isinstance(value.value, (int, float, complex, str, bool, type(None))))
+
+
+def _scope_nodes(node: ast.AST):
+    """Every node of one scope's body, not descending into nested scopes"""
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        yield child
+        if not isinstance(child, _SCOPES):
+            stack.extend(ast.iter_child_nodes(child))
+
+
+def _body_nodes(statements: Iterable[ast.stmt]):
+    """Every node of a list of statements, not descending into nested scopes"""
+    stack = list(statements)
+    while stack:
+        child = stack.pop()
+        yield child
+        if not isinstance(child, _SCOPES):
+            stack.extend(ast.iter_child_nodes(child))
+
+
+def _has_suspension(nodes: Iterable[ast.AST]) -> bool:
+    """Whether removing these nodes could change what kind of function holds them"""
+    for root in nodes:
+        for node in [root, *_scope_nodes(root)]:
+            if isinstance(node, (ast.Yield, ast.YieldFrom, ast.Await, ast.Global, ast.Nonlocal)):
+                return True
+    return False
+
+
+def _unique_name(prefix: str, taken: Set[str]) -> str:
+    index = 0
+    while f"{prefix}{index}" in taken:
+        index += 1
+    name = f"{prefix}{index}"
+    taken.add(name)
+    return name
+
+
+def _fits(value) -> bool:
+    if isinstance(value, (str, bytes, tuple)):
+        return len(value) <= _MAX_FOLDED_SIZE
+    if isinstance(value, int):
+        return value.bit_length() <= _MAX_FOLDED_SIZE
+    return True
+
+
+def _safe_binary(op: ast.operator, left, right) -> bool:
+    """Reject folds that would take a long time or a lot of memory to compute"""
+    if isinstance(op, ast.Pow) and isinstance(right, int) and isinstance(left, (int, float)):
+        return abs(right) <= 64 or abs(left) <= 1
+    if isinstance(op, ast.LShift) and isinstance(right, int):
+        return right <= _MAX_FOLDED_SIZE
+    if isinstance(op, ast.Mult):
+        for seq, count in ((left, right), (right, left)):
+            if isinstance(seq, (str, bytes, tuple)) and isinstance(count, int):
+                return len(seq) * count <= _MAX_FOLDED_SIZE
+    return True
+
+
+def _fill_empty_bodies(tree: ast.AST) -> None:
+    """Give statement blocks emptied by a pass a `pass` so they still compile.
+
+    Every `body` needs one, handler bodies included, and so does a
+    `finally:` block when its try has no handlers. An empty `orelse`, or
+    an empty `finalbody` beside handlers, just means there is none.
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Module):
+            continue
+        body = getattr(node, 'body', None)
+        if isinstance(body, list) and not body:
+            node.body = [ast.copy_location(ast.Pass(), node)]
+        if isinstance(node, _TRY_NODES) and not node.handlers and not node.finalbody:
+            node.finalbody = [ast.copy_location(ast.Pass(), node)]
+
+
+# ============ PASSES ============
+
+class ConstantFolder(ast.NodeTransformer):
+    """Evaluate operators whose operands are all constants.
+
+    true/false/null count as constants unless the script rebinds them.
+    Folds that raise (1 / 0) are left for runtime to report.
+    """
+
+    def __init__(self, bound: Set[str]):
+        self.constants = {name: value for name, value in _CONSTANT_NAMES.items() if name not in bound}
+
+    def _constant(self, value, node):
+        return ast.copy_location(ast.Constant(value=value), node)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load) and node.id in self.constants:
+            return self._constant(self.constants[node.id], node)
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
+            left, right = node.left.value, node.right.value
+            if _safe_binary(node.op, left, right):
+                try:
+                    value = _BINARY_OPS[type(node.op)](left, right)
+                except Exception:
+                    return node
+                if _fits(value):
+                    return self._constant(value, node)
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.operand, ast.Constant):
+            try:
+                value = _UNARY_OPS[type(node.op)](node.operand.value)
+            except Exception:
+                return node
+            return self._constant(value, node)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left, *node.comparators]
+        if not all(isinstance(operand, ast.Constant) for operand in operands):
+            return node
+        try:
+            result = True
+            for op, left, right in zip(node.ops, operands, operands[1:]):
+                result = _COMPARE_OPS[type(op)](left.value, right.value)
+                if not result:
+                    break
+        except Exception:
+            return node
+        return self._constant(result, node)
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        is_and = isinstance(node.op, ast.And)
+        values = list(node.values)
+        # Leading constants either decide the result or drop out of it
+        while values and isinstance(values[0], ast.Constant):
+            if bool(values[0].value) != is_and or len(values) == 1:
+                return values[0]
+            values.pop(0)
+        if len(values) == 1:
+            return values[0]
+        node.values = values
+        return node
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.test, ast.Constant):
+            return node.body if node.test.value else node.orelse
+        return node
+
+
+class DeadBranchEliminator(ast.NodeTransformer):
+    """Drop `if` and `while` branches whose condition is a constant.
+
+    Conditions folded to constants count, and so do bare true/false/null
+    when the script doesn't rebind them, so the pass also works alone.
+    Branches holding yield/await/global/nonlocal are kept, since removing
+    them would change the enclosing function's meaning.
+    """
+
+    _UNDECIDED = object()
+
+    def __init__(self, bound: Set[str]):
+        self.constants = {name: value for name, value in _CONSTANT_NAMES.items() if name not in bound}
+
+    def _test_value(self, test):
+        if isinstance(test, ast.Constant):
+            return test.value
+        if isinstance(test, ast.Name) and test.id in self.constants:
+            return self.constants[test.id]
+        return self._UNDECIDED
+
+    def visit_If(self, node):
+        self.generic_visit(node)
+        value = self._test_value(node.test)
+        if value is self._UNDECIDED:
+            return node
+        keep, drop = (node.body, node.orelse) if value else (node.orelse, node.body)
+        if _has_suspension(drop):
+            return node
+        return keep
+
+    def visit_While(self, node):
+        self.generic_visit(node)
+        value = self._test_value(node.test)
+        if value is not self._UNDECIDED and not value and not _has_suspension(node.body):
+            return node.orelse
+        return node
+
+
+class LoopInvariantHoister(ast.NodeTransformer):
+    """Compute invariant expressions of `for _ in range(N)` loops once, before the loop.
+
+    This is the shape `loop N times` transpiles to; with N a positive
+    constant the body is known to run. Only operator expressions over
+    constants and scalar names (bound only to number, string, bool or None
+    constants) are hoisted, so the hoisted value is immutable and sharing it
+    between iterations is safe. Statements are scanned from the top of the
+    body up to and including the first one with a visible effect, so an
+    expression that raises never does so before output the loop would have
+    produced. The loop may not rebind those names, mutate them through an
+    attribute or subscript, or call anything but the builtins in
+    _PURE_BUILTINS, which could otherwise change them behind its back.
+    """
+
+    _HOISTABLE = (ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp)
+    _OPERANDS = (ast.Name, ast.Constant, ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp,
+                 ast.operator, ast.unaryop, ast.cmpop, ast.boolop, ast.expr_context)
+    # Statements whose own expression runs unconditionally each iteration
+    _SIMPLE = (ast.Assign, ast.AugAssign, ast.AnnAssign, ast.Expr, ast.Return, ast.If)
+
+    # Pure builtins that also leave the loop's observable state alone
+    _QUIET_BUILTINS = _PURE_BUILTINS - {'print'}
+
+    def __init__(self, bound: Set[str], taken: Set[str], scalars: Set[str]):
+        self.module_bound = bound
+        self.taken = taken
+        self.scalars = scalars
+
+    def visit_For(self, node):
+        self.generic_visit(node)
+        if not self._runs_constant_times(node) or not self._calls_only_pure_builtins(node.body):
+            return node
+
+        changed = _bound_names(node.body) | _bound_names([node.target])
+        for child in ast.walk(ast.Module(body=node.body, type_ignores=[])):
+            if isinstance(child, (ast.Attribute, ast.Subscript)) and isinstance(child.value, ast.Name):
+                changed.add(child.value.id)
+
+        hoisted: List[ast.stmt] = []
+        for stmt in node.body:
+            if not isinstance(stmt, self._SIMPLE):
+                break
+            field = 'test' if isinstance(stmt, ast.If) else 'value'
+            value = getattr(stmt, field)
+            if value is not None:
+                setattr(stmt, field, self._hoist(value, changed, hoisted))
+            if isinstance(stmt, (ast.If, ast.Return)) or self._has_effect(stmt):
+                # Later statements may be skipped, or must not be
+                # preceded by an error raised from a hoisted expression
+                break
+        return [*hoisted, node] if hoisted else node
+
+    def _runs_constant_times(self, node) -> bool:
+        it = node.iter
+        return (not node.orelse
+                and isinstance(it, ast.Call) and isinstance(it.func, ast.Name)
+                and it.func.id == 'range' and 'range' not in self.module_bound
+                and len(it.args) == 1 and not it.keywords
+                and isinstance(it.args[0], ast.Constant)
+                and isinstance(it.args[0].value, int) and it.args[0].value > 0)
+
+    def _calls_only_pure_builtins(self, body) -> bool:
+        for stmt in body:
+            for node in ast.walk(stmt):
+                if isinstance(node, ast.Call):
+                    func = node.func
+                    if not (isinstance(func, ast.Name) and func.id in _PURE_BUILTINS
+                            and func.id not in self.module_bound):
+                        return False
+                elif isinstance(node, (ast.Await, ast.Yield, ast.YieldFrom)):
+                    return False
+        return True
+
+    def _has_effect(self, stmt) -> bool:
+        """Whether a statement does more than assign local names"""
+        if not isinstance(stmt, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+            return True
+        targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+        if not all(isinstance(target, ast.Name) for target in targets):
+            return True
+        return any(isinstance(node, ast.Call) and node.func.id not in self._QUIET_BUILTINS
+                   for node in ast.walk(stmt))
+
+    def _invariant(self, expr, changed) -> bool:
+        has_name = False
+        for node in ast.walk(expr):
+            if not isinstance(node, self._OPERANDS):
+                return False
+            if isinstance(node, ast.Name):
+                if node.id in changed or node.id not in self.scalars:
+                    return False
+                has_name = True
+        return has_name
+
+    def _hoist(self, expr, changed, hoisted):
+        if isinstance(expr, self._HOISTABLE) and self._invariant(expr, changed):
+            name = _unique_name('_ep_inv', self.taken)
+            hoisted.append(ast.copy_location(
+                ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=expr), expr))
+            return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), expr)
+        # Only operands that are always evaluated may be hoisted
+        if isinstance(expr, ast.BinOp):
+            expr.left = self._hoist(expr.left, changed, hoisted)
+            expr.right = self._hoist(expr.right, changed, hoisted)
+        elif isinstance(expr, ast.UnaryOp):
+            expr.operand = self._hoist(expr.operand, changed, hoisted)
+        elif isinstance(expr, ast.Compare):
+            expr.left = self._hoist(expr.left, changed, hoisted)
+        elif isinstance(expr, ast.BoolOp):
+            expr.values[0] = self._hoist(expr.values[0], changed, hoisted)
+        elif isinstance(expr, ast.Call):
+            expr.args = [self._hoist(arg, changed, hoisted) for arg in expr.args]
+        return expr
+
+
+class FastLocalAliaser(ast.NodeTransformer):
+    """Bind the builtins a function's loops use to locals on entry.
+
+    Inside functions, builtins are looked up in globals and then builtins on
+    every access; a local alias is a single indexed load. Only builtins the
+    script never rebinds (and that the Easypy runtime doesn't shadow) are
+    aliased, and nested scopes keep their own lookups.
+    """
+
+    def __init__(self, bound: Set[str], taken: Set[str], runtime_names: Set[str]):
+        self.excluded = bound | runtime_names
+        self.taken = taken
+
+    def visit_FunctionDef(self, node):
+        self.generic_visit(node)
+        loop_names = set()
+        # Only the body: defaults and decorators run in the enclosing scope
+        for child in _body_nodes(node.body):
+            if isinstance(child, (ast.For, ast.AsyncFor, ast.While)):
+                for inner in [child, *_scope_nodes(child)]:
+                    if isinstance(inner, ast.Name) and isinstance(inner.ctx, ast.Load):
+                        loop_names.add(inner.id)
+        local_bound = _bound_names(node.body) | _bound_names([node.args])
+        names = sorted(name for name in loop_names
+                       if hasattr(builtins, name) and name not in self.excluded
+                       and name not in local_bound)
+        if not names:
+            return node
+
+        aliases = {name: _unique_name(f'_ep_{name}', self.taken) for name in names}
+        for child in _body_nodes(node.body):
+            if isinstance(child, ast.Name) and child.id in aliases:
+                child.id = aliases[child.id]
+        bindings = [ast.copy_location(
+            ast.Assign(targets=[ast.Name(id=alias, ctx=ast.Store())], value=ast.Name(id=name, ctx=ast.Load())),
+            node.body[0]) for name, alias in aliases.items()]
+        # Keep a docstring first
+        first = node.body[0]
+        at = 1 if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) \
+            and isinstance(first.value.value, str) else 0
+        node.body[at:at] = bindings
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+# ============ PIPELINE ============
+
+def _runtime_names() -> Set[str]:
+    """Names the generated code's star import brings in"""
+    from . import modules_real
+    return {name for name in dir(modules_real) if not name.startswith('_')}
+
+
+def fold_constants(tree: ast.Module, context: Dict) -> ast.Module:
+    return ConstantFolder(context['bound']).visit(tree)
+
+
+def eliminate_dead_branches(tree: ast.Module, context: Dict) -> ast.Module:
+    return DeadBranchEliminator(context['bound']).visit(tree)
+
+
+def hoist_loop_invariants(tree: ast.Module, context: Dict) -> ast.Module:
+    # After folding, so `n = 2 * 3` counts as a scalar binding
+    return LoopInvariantHoister(context['bound'], context['taken'], _scalar_names(tree)).visit(tree)
+
+
+def alias_fast_locals(tree: ast.Module, context: Dict) -> ast.Module:
+    return FastLocalAliaser(context['bound'], context['taken'], _runtime_names()).visit(tree)
+
+
+# Passes in the order they run; folding first lets dead-branch elimination
+# see conditions that only become constant once folded
+PASSES = {
+    'fold': fold_constants,
+    'dead': eliminate_dead_branches,
+    'hoist': hoist_loop_invariants,
+    'locals': alias_fast_locals,
+}
+
+
+def parse_passes(spec: Optional[str]) -> tuple:
+    """Pass names from a comma separated list; None or 'all' selects every pass"""
+    if spec is None or spec.strip() == 'all':
+        return tuple(PASSES)
+    names = tuple(name.strip() for name in spec.split(',') if name.strip())
+    unknown = [name for name in names if name not in PASSES]
+    if unknown:
+        raise ValueError(f"Unknown optimization pass: {', '.join(unknown)} "
+                         f"(available: {', '.join(PASSES)})")
+    return names
+
+
+def optimize(tree: ast.Module, passes: Iterable[str] = tuple(PASSES)) -> ast.Module:
+    """Run the selected passes over a transpiled module, in pipeline order"""
+    selected = set(passes)
+    names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    context = {'bound': _bound_names([tree]), 'taken': names | _bound_names([tree])}
+    for name, run in PASSES.items():
+        if name in selected:
+            tree = run(tree, context)
+    _fill_empty_bodies(tree)
+    return ast.fix_missing_locations(tree)
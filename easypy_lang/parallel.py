@@ -0,0 +1,83 @@
+"""
+Easypy Parallel
+Runs the body of a `parallel for` loop over its items on a thread or process pool
+"""
+
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+MODES = ('processes', 'threads')
+# Chunks per worker: enough to even out uneven items, few enough to keep
+# per-task overhead (pickling, queueing) small
+CHUNKS_PER_WORKER = 4
+
+# Loop bodies of the running parallel loops, by id. Forked workers inherit
+# this table, so a body defined anywhere (even inside a function) can run
+# in a child process without being picklable itself.
+_bodies: Dict[int, Callable] = {}
+_ids = itertools.count()
+
+
+def _run_chunk(body_id: int, chunk: List[Any]) -> List[Any]:
+    body = _bodies[body_id]
+    return [body(item) for item in chunk]
+
+
+def _fork_context():
+    """The fork start method, or None on platforms without it"""
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context('fork')
+
+
+def _executor(mode: str, workers: int) -> Executor:
+    if mode == 'processes':
+        context = _fork_context()
+        if context is not None:
+            return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def parallel_map(body: Callable, items: Iterable, mode: str = 'processes',
+                 workers: Optional[int] = None) -> List[Any]:
+    """Call body on every item on a pool and return the results in item order.
+
+    This is what `results = parallel for x in items { ... }` runs: the loop
+    body is `body`, and each iteration's `return` value (None without one)
+    lands at its item's position in the list. Items are sent in chunks of
+    about len(items) / (workers * 4), one task per chunk. With processes,
+    items and results are pickled and the children are forked; where fork
+    is unavailable threads are used instead. An exception from the body is
+    raised here for the earliest failing item, and the remaining chunks are
+    cancelled.
+    """
+    if mode not in MODES:
+        raise ValueError(f"parallel mode must be one of {', '.join(MODES)}, not {mode!r}")
+    items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+        if mode == 'threads':
+            workers = min(32, workers + 4)
+    workers = max(1, min(int(workers), len(items)))
+    if workers == 1:
+        return [body(item) for item in items]
+
+    size = -(-len(items) // (workers * CHUNKS_PER_WORKER))
+    chunks = [items[start:start + size] for start in range(0, len(items), size)]
+    body_id = next(_ids)
+    _bodies[body_id] = body
+    executor = _executor(mode, workers)
+    try:
+        results = []
+        for chunk_results in executor.map(_run_chunk, itertools.repeat(body_id), chunks):
+            results.extend(chunk_results)
+        executor.shutdown()
+        return results
+    except BaseException:
+        executor.shutdown(cancel_futures=True)
+        raise
+    finally:
+        del _bodies[body_id]
@@ -0,0 +1,368 @@
+"""
+Easypy Profiler
+Line-level timing for Easypy programs, reported against the original .ep lines
+"""
+
+import json
+import marshal
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+
+class _FrameRecord:
+    __slots__ = ('line', 'line_start', 'child_time', 'frame_start')
+
+    def __init__(self, now: float):
+        self.line = None
+        self.line_start = now
+        self.child_time = 0.0
+        self.frame_start = now
+
+
+def _format_size(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class _SourceProfiler:
+    """Shared plumbing: which code to watch and how to name its lines.
+
+    Transpiled programs are watched through `code_filename`, the filename the
+    generated code was compiled under. run_file compiles them on .ep lines
+    already; code compiled on generated Python lines can pass `line_map`
+    (EasypyTranspiler.source_map) to fold them back onto .ep lines.
+    Line 0, where the transpiler puts its header imports, and generated
+    lines missing from line_map belong to no .ep line and are left out.
+    The engine reports .ep lines directly through `run_instruction`.
+    """
+
+    def __init__(self, filename: str, source: str = "", code_filename: Optional[str] = None,
+                 line_map: Optional[Dict[int, int]] = None):
+        self.filename = filename
+        self.source_lines = source.split('\n')
+        self.code_filename = code_filename
+        self.line_map = line_map
+
+    def _ep_line(self, line: int) -> Optional[int]:
+        if self.line_map is not None:
+            line = self.line_map.get(line)
+        return line or None
+
+    def _source(self, line: int) -> str:
+        if 0 < line <= len(self.source_lines):
+            return self.source_lines[line - 1].strip()
+        return ""
+
+
+class LineProfiler(_SourceProfiler):
+    """Per-line hit counts, self time and cumulative time.
+
+    Self time excludes time spent in other traced frames (Easypy functions
+    called from the line); cumulative time includes it.
+    """
+
+    def __init__(self, filename: str, source: str = "", code_filename: Optional[str] = None,
+                 line_map: Optional[Dict[int, int]] = None):
+        super().__init__(filename, source, code_filename, line_map)
+        # line -> [hits, self seconds, cumulative seconds]
+        self.stats: Dict[int, List[float]] = {}
+        self.total_time = 0.0
+        self._start = 0.0
+        self._stack: List[_FrameRecord] = []
+
+    # ============ COLLECTION ============
+
+    def record(self, line: int, elapsed: float, hits: int = 1) -> None:
+        """Account one run of a line that has no traced callees"""
+        entry = self.stats.get(line)
+        if entry is None:
+            entry = self.stats[line] = [0, 0.0, 0.0]
+        entry[0] += hits
+        entry[1] += elapsed
+        entry[2] += elapsed
+
+    def run_instruction(self, instr, engine) -> None:
+        start = time.perf_counter()
+        try:
+            instr.run(engine)
+        finally:
+            self.record(instr.line, time.perf_counter() - start)
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        self.total_time += time.perf_counter() - self._start
+
+    def run(self, code, namespace: dict, execute=exec) -> None:
+        """exec() code, or run it with execute(code, namespace), under the line tracer"""
+        self.start()
+        sys.settrace(self._trace_call)
+        try:
+            execute(code, namespace)
+        finally:
+            sys.settrace(None)
+            now = time.perf_counter()
+            while self._stack:
+                self._close_line(self._stack.pop(), now)
+            self.stop()
+
+    def _trace_call(self, frame, event, arg):
+        if event != 'call' or frame.f_code.co_filename != self.code_filename:
+            return None
+        self._stack.append(_FrameRecord(time.perf_counter()))
+        return self._trace_local
+
+    def _trace_local(self, frame, event, arg):
+        if event == 'line':
+            now = time.perf_counter()
+            record = self._stack[-1]
+            self._close_line(record, now)
+            record.line = frame.f_lineno
+            record.line_start = now
+            record.child_time = 0.0
+            entry = self.stats.get(record.line)
+            if entry is None:
+                entry = self.stats[record.line] = [0, 0.0, 0.0]
+            entry[0] += 1
+        elif event == 'return':
+            now = time.perf_counter()
+            record = self._stack.pop()
+            self._close_line(record, now)
+            if self._stack:
+                self._stack[-1].child_time += now - record.frame_start
+        return self._trace_local
+
+    def _close_line(self, record: _FrameRecord, now: float) -> None:
+        if record.line is None:
+            return
+        elapsed = now - record.line_start
+        entry = self.stats[record.line]
+        entry[1] += elapsed - record.child_time
+        entry[2] += elapsed
+
+    # ============ REPORTING ============
+
+    def results(self) -> List[dict]:
+        """Per .ep line results, slowest self time first"""
+        merged: Dict[int, List[float]] = {}
+        for line, (hits, self_time, cum_time) in self.stats.items():
+            line = self._ep_line(line)
+            if line is None:
+                continue
+            entry = merged.setdefault(line, [0, 0.0, 0.0])
+            entry[0] += hits
+            entry[1] += self_time
+            entry[2] += cum_time
+
+        rows = []
+        for line, (hits, self_time, cum_time) in merged.items():
+            rows.append({
+                "line": line,
+                "hits": int(hits),
+                "self": self_time,
+                "cumulative": cum_time,
+                "source": self._source(line),
+            })
+        rows.sort(key=lambda row: (-row["self"], row["line"]))
+        return rows
+
+    def print_report(self, limit: Optional[int] = 30, stream=None) -> None:
+        stream = stream or sys.stdout
+        rows = self.results()
+        total = sum(row["self"] for row in rows) or 1.0
+        print(f"\n⏱️  Profile for {self.filename} ({self.total_time:.4f}s total)", file=stream)
+        print(f"{'Line':>6} {'Hits':>10} {'Self (s)':>11} {'Cum (s)':>11} {'%Self':>7}  Source", file=stream)
+        for row in rows[:limit] if limit else rows:
+            print(f"{row['line']:>6} {row['hits']:>10} {row['self']:>11.6f} {row['cumulative']:>11.6f} "
+                  f"{row['self'] / total * 100:>6.1f}%  {row['source'][:60]}", file=stream)
+
+    def dump(self, path: str) -> None:
+        """Write results as JSON, or as a pstats file for .prof / .pstats paths"""
+        if path.endswith(('.prof', '.pstats')):
+            with open(path, 'wb') as f:
+                marshal.dump(self.pstats_dict(), f)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "file": self.filename,
+                    "total_time": self.total_time,
+                    "lines": sorted(self.results(), key=lambda row: row["line"]),
+                }, f, indent=2)
+
+    def pstats_dict(self) -> dict:
+        """Results in the layout pstats.Stats loads, one pseudo-function per line"""
+        stats = {}
+        for row in self.results():
+            key = (self.filename, row["line"], row["source"][:60] or f"line {row['line']}")
+            stats[key] = (row["hits"], row["hits"], row["self"], row["cumulative"], {})
+        return stats
+
+
+class MemoryProfiler(_SourceProfiler):
+    """Peak and retained allocations per line, from tracemalloc.
+
+    For transpiled code every snapshot charges each live block to the
+    innermost frame of the generated code that allocated it, so memory
+    allocated inside library calls lands on the .ep line that made the call.
+    Only the `nframes` innermost frames are recorded, so a block allocated
+    deeper than that below the script (inside a large import, say) is left
+    out.
+    Retained memory comes from the snapshot taken as the program finishes;
+    a line's peak is the most it held in any snapshot, so `interval`
+    (seconds between background snapshots) also sharpens the peaks while
+    recording how memory grows over time.
+
+    The engine path measures each instruction instead: the memory it left
+    behind, and the high-water mark it reached above its starting point.
+    """
+
+    def __init__(self, filename: str, source: str = "", code_filename: Optional[str] = None,
+                 line_map: Optional[Dict[int, int]] = None, interval: Optional[float] = None,
+                 nframes: int = 4):
+        super().__init__(filename, source, code_filename, line_map)
+        self.interval = interval
+        self.nframes = nframes
+        # line -> [peak bytes, retained bytes, live blocks or runs]
+        self.stats: Dict[int, List[int]] = {}
+        # (seconds since start, traced bytes, bytes charged to the script)
+        self.timeline: List[tuple] = []
+        self.peak_total = 0
+        self.total_time = 0.0
+        self._start = 0.0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    # ============ COLLECTION ============
+
+    def start(self) -> None:
+        tracemalloc.start(self.nframes)
+        self._start = time.perf_counter()
+        if self.interval:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        self.snapshot(final=True)
+        self.peak_total = tracemalloc.get_traced_memory()[1]
+        self.total_time = time.perf_counter() - self._start
+        tracemalloc.stop()
+
+    def run(self, code, namespace: dict, execute=exec) -> None:
+        """exec() code, or run it with execute(code, namespace), with
+        tracemalloc running; the final snapshot is taken while the
+        program's namespace is still alive"""
+        self.start()
+        try:
+            execute(code, namespace)
+        finally:
+            self.stop()
+
+    def run_instruction(self, instr, engine) -> None:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            instr.run(engine)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            entry = self.stats.get(instr.line)
+            if entry is None:
+                entry = self.stats[instr.line] = [0, 0, 0]
+            entry[0] = max(entry[0], peak - before)
+            entry[1] += current - before
+            entry[2] += 1
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.snapshot()
+
+    def snapshot(self, final: bool = False) -> None:
+        """Charge live memory to lines and add a point to the timeline"""
+        traced = tracemalloc.get_traced_memory()[0]
+        elapsed = time.perf_counter() - self._start
+        if self.code_filename is None:
+            self.timeline.append((elapsed, traced, None))
+            return
+
+        sizes: Dict[int, int] = {}
+        blocks: Dict[int, int] = {}
+        code_filename = self.code_filename
+        # Only blocks with a script frame are kept before grouping: the rest
+        # (the interpreter's and the profiler's own) would be grouped only to
+        # be dropped. Grouping by traceback then leaves one entry per distinct
+        # allocation site, far fewer than the blocks themselves
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, code_filename, all_frames=True)])
+        for stat in snapshot.statistics('traceback'):
+            # Frames run oldest first; charge the innermost script frame
+            for frame in reversed(stat.traceback):
+                if frame.filename == code_filename:
+                    line = self._ep_line(frame.lineno)
+                    if line is not None:
+                        sizes[line] = sizes.get(line, 0) + stat.size
+                        blocks[line] = blocks.get(line, 0) + stat.count
+                    break
+
+        for line, size in sizes.items():
+            entry = self.stats.get(line)
+            if entry is None:
+                entry = self.stats[line] = [0, 0, 0]
+            entry[0] = max(entry[0], size)
+            if final:
+                entry[1] = size
+                entry[2] = blocks[line]
+        self.timeline.append((elapsed, traced, sum(sizes.values())))
+
+    # ============ REPORTING ============
+
+    def results(self) -> List[dict]:
+        """Per .ep line results, largest peak first"""
+        rows = [{
+            "line": line,
+            "peak": peak,
+            "retained": retained,
+            "count": count,
+            "source": self._source(line),
+        } for line, (peak, retained, count) in self.stats.items()]
+        rows.sort(key=lambda row: (-row["peak"], -row["retained"], row["line"]))
+        return rows
+
+    def print_report(self, limit: Optional[int] = 30, stream=None) -> None:
+        stream = stream or sys.stdout
+        rows = self.results()
+        count_label = "Blocks" if self.code_filename else "Runs"
+        print(f"\n🧠 Memory profile for {self.filename} "
+              f"(peak {_format_size(self.peak_total)}, {self.total_time:.2f}s)", file=stream)
+        print(f"{'Line':>6} {'Peak':>11} {'Retained':>11} {count_label:>8}  Source", file=stream)
+        for row in rows[:limit] if limit else rows:
+            print(f"{row['line']:>6} {_format_size(row['peak']):>11} {_format_size(row['retained']):>11} "
+                  f"{row['count']:>8}  {row['source'][:60]}", file=stream)
+        if len(self.timeline) > 1:
+            print("\n   Time      Traced   In script", file=stream)
+            for elapsed, traced, attributed in self.timeline:
+                in_script = "-" if attributed is None else _format_size(attributed)
+                print(f"{elapsed:>7.2f}s {_format_size(traced):>11} {in_script:>11}", file=stream)
+
+    def dump(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "file": self.filename,
+                "peak": self.peak_total,
+                "total_time": self.total_time,
+                "lines": sorted(self.results(), key=lambda row: row["line"]),
+                "timeline": [
+                    {"time": elapsed, "traced": traced, "script": attributed}
+                    for elapsed, traced, attributed in self.timeline
+                ],
+            }, f, indent=2)
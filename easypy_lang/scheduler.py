@@ -0,0 +1,319 @@
+"""
+Easypy Scheduler
+Runs the jobs of `every 5 minutes ---> task()` and `at "02:00" ---> task()`
+"""
+
+import datetime
+import heapq
+import itertools
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+MODES = ('inline', 'threads')
+# Longest sleep before an `at` job looks at the wall clock again, so a
+# clock change moves it within this many seconds
+WALL_CLOCK_CHECK = 60.0
+_TIME_RE = re.compile(r'^(\d{1,2}):(\d{2})(?::(\d{2}))?$')
+
+
+def _parse_time(value: str) -> datetime.time:
+    match = _TIME_RE.match(str(value).strip())
+    if not match:
+        raise ValueError(f"`at` needs a time such as \"02:00\" or \"14:30:15\", not {value!r}")
+    hour, minute, second = (int(part or 0) for part in match.groups())
+    if hour > 23 or minute > 59 or second > 59:
+        raise ValueError(f"`at` time out of range: {value!r}")
+    return datetime.time(hour, minute, second)
+
+
+class Job:
+    """One scheduled function; returned by every() and at() so it can be cancelled"""
+
+    def __init__(self, func: Callable, mode: str, interval: Optional[float] = None,
+                 time_of_day: Optional[datetime.time] = None):
+        self.func = func
+        self.mode = mode
+        self.interval = interval
+        self.time_of_day = time_of_day
+        self.runs = 0
+        self.skipped = 0
+        self.cancelled = False
+        self.running = False
+        # time.monotonic() of the next run
+        self.due = 0.0
+        # Local date and time of the next run of an `at` job
+        self.target: Optional[datetime.datetime] = None
+        self._scheduler: Optional["Scheduler"] = None
+
+    def cancel(self) -> None:
+        """Stop future runs; a run already in progress finishes"""
+        self.cancelled = True
+        if self._scheduler is not None:
+            self._scheduler._wake()
+
+    def _next_due(self, due: float, now: float) -> float:
+        if self.interval is not None:
+            # Step from the scheduled time, not from when the run ended, so
+            # slow runs do not push later ones back; runs that were missed
+            # entirely are skipped rather than replayed in a burst
+            due += self.interval
+            if due <= now:
+                missed = int((now - due) // self.interval) + 1
+                self.skipped += missed
+                due += missed * self.interval
+            return due
+        # The same time tomorrow; days the clock jumped past are skipped
+        self.target += datetime.timedelta(days=1)
+        wall_now = datetime.datetime.now()
+        if self.target <= wall_now:
+            self.skipped += (wall_now - self.target).days + 1
+            self.target = _next_occurrence(self.time_of_day, wall_now)
+        return now + (self.target - wall_now).total_seconds()
+
+    def _wall_due(self, now: float) -> float:
+        """Monotonic time of the next run of an `at` job, by the wall clock now"""
+        return now + (self.target - datetime.datetime.now()).total_seconds()
+
+    def __repr__(self):
+        when = f"every {self.interval:g}s" if self.interval is not None else f"at {self.time_of_day}"
+        return f"<Job {getattr(self.func, '__name__', self.func)} {when}, {self.runs} runs>"
+
+
+def _next_occurrence(time_of_day: datetime.time, now: datetime.datetime) -> datetime.datetime:
+    """The first time_of_day after now, local time"""
+    target = datetime.datetime.combine(now.date(), time_of_day)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    return target
+
+
+class _WorkerPool:
+    """Threads that run `threads` jobs, started as the jobs need them.
+
+    concurrent.futures workers are joined when the interpreter exits, so a
+    script that fails after scheduling a job would never end; these are
+    daemon threads, like the scheduler thread itself.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self._queue: "queue.SimpleQueue[Optional[Callable]]" = queue.SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        self._idle = threading.Semaphore(0)
+
+    def submit(self, task: Callable) -> None:
+        self._queue.put(task)
+        if not self._idle.acquire(blocking=False) and len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"easypy-job-{len(self._threads)}",
+                                      daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            task()
+            self._idle.release()
+
+    def shutdown(self) -> None:
+        """Let queued tasks finish, then end the threads"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class Scheduler:
+    """Timers in a heap ordered by due time, served by one thread.
+
+    Adding or cancelling a job is O(log n) and the thread sleeps until the
+    earliest due time, so thousands of timers cost nothing between runs.
+    Interval jobs are due at start + k * interval on the monotonic clock,
+    which keeps drift bounded by how late the thread wakes, not cumulative.
+    `at` jobs keep their next local date and time and re-read the wall
+    clock whenever they are next in line (at least every WALL_CLOCK_CHECK
+    seconds), so a clock change neither repeats nor delays a run.
+    `inline` jobs run on the scheduler thread, one after another; `threads`
+    jobs are handed to a thread pool, and a run is skipped while the
+    previous run of the same job is still going. The thread is a daemon, so
+    it never holds the process open by itself: `easypy` calls
+    run_until_done() after the script's last line, which keeps the jobs
+    running until every one is cancelled or stop() is called, while an
+    error or Ctrl-C in the script still ends the process.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[_WorkerPool] = None
+        self._stopped = False
+
+    def every(self, seconds: float, func: Callable, mode: str = 'inline') -> Job:
+        """Run func every `seconds`, the first time one interval from now"""
+        seconds = float(seconds)
+        if seconds <= 0:
+            raise ValueError("`every` needs a positive interval")
+        job = Job(func, self._check_mode(mode), interval=seconds)
+        return self._add(job, time.monotonic() + seconds)
+
+    def at(self, time_of_day: str, func: Callable, mode: str = 'inline') -> Job:
+        """Run func daily at time_of_day ("HH:MM" or "HH:MM:SS", local time)"""
+        job = Job(func, self._check_mode(mode), time_of_day=_parse_time(time_of_day))
+        job.target = _next_occurrence(job.time_of_day, datetime.datetime.now())
+        return self._add(job, job._wall_due(time.monotonic()))
+
+    @staticmethod
+    def _check_mode(mode: str) -> str:
+        if mode not in MODES:
+            raise ValueError(f"schedule mode must be one of {', '.join(MODES)}, not {mode!r}")
+        return mode
+
+    def _add(self, job: Job, due: float) -> Job:
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("the scheduler has been stopped")
+            job.due = due
+            job._scheduler = self
+            heapq.heappush(self._heap, (due, next(self._order), job))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="easypy-scheduler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return job
+
+    def join(self) -> None:
+        """Block until the scheduler thread ends: every job cancelled, or stop()"""
+        while True:
+            with self._condition:
+                thread = self._thread
+            if thread is None or thread is threading.current_thread():
+                return
+            thread.join()
+
+    def _wake(self) -> None:
+        with self._condition:
+            self._condition.notify()
+
+    def jobs(self) -> List[Job]:
+        """Scheduled jobs, soonest first"""
+        with self._condition:
+            return [job for _, _, job in sorted(self._heap) if not job.cancelled]
+
+    def stop(self, wait: bool = True) -> None:
+        """Cancel every job and end the scheduler thread"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+            thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                job = self._next_job()
+                if job is None:
+                    # Under the lock, so a job added from now on starts a new thread
+                    self._thread = None
+                    pool, self._pool = self._pool, None
+                    break
+            self._start(job)
+        if pool is not None:
+            pool.shutdown()
+
+    def _next_job(self) -> Optional[Job]:
+        """Wait for the earliest job to come due and reschedule it; None to stop"""
+        while not self._stopped:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return None
+            due, _, job = self._heap[0]
+            now = time.monotonic()
+            if job.time_of_day is not None:
+                # Due times are on the monotonic clock, `at` times on the
+                # wall clock: re-read it, so a clock change or drift moves
+                # the run instead of repeating or delaying it
+                wall_due = job._wall_due(now)
+                if abs(wall_due - due) > 0.001:
+                    job.due = wall_due
+                    heapq.heapreplace(self._heap, (wall_due, next(self._order), job))
+                    continue
+                if due > now:
+                    self._condition.wait(min(due - now, WALL_CLOCK_CHECK))
+                    continue
+            elif due > now:
+                self._condition.wait(due - now)
+                continue
+            job.due = job._next_due(due, now)
+            heapq.heapreplace(self._heap, (job.due, next(self._order), job))
+            return job
+        return None
+
+    def _start(self, job: Job) -> None:
+        if job.mode == 'inline':
+            self._call(job)
+            return
+        if job.running:
+            job.skipped += 1
+            return
+        if self._pool is None:
+            self._pool = _WorkerPool(self.workers)
+        job.running = True
+        self._pool.submit(lambda: self._call(job))
+
+    @staticmethod
+    def _call(job: Job) -> None:
+        try:
+            job.func()
+        except Exception:
+            import traceback
+            print(f"⚠️ Scheduled job {getattr(job.func, '__name__', job.func)} failed:", file=sys.stderr)
+            traceback.print_exc()
+        finally:
+            job.runs += 1
+            job.running = False
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """The process-wide scheduler used by `every` and `at`"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+        return _scheduler
+
+
+def schedule_every(seconds: float, func: Callable, mode: str = 'inline') -> Job:
+    """`every N unit ---> job`: run func every `seconds` on the shared scheduler"""
+    return get_scheduler().every(seconds, func, mode)
+
+
+def schedule_at(time_of_day: str, func: Callable, mode: str = 'inline') -> Job:
+    """`at "HH:MM" ---> job`: run func daily at that local time on the shared scheduler"""
+    return get_scheduler().at(time_of_day, func, mode)
+
+
+def run_until_done() -> None:
+    """Wait for the shared scheduler's jobs to finish; Ctrl-C stops them"""
+    if _scheduler is None:
+        return
+    try:
+        _scheduler.join()
+    except KeyboardInterrupt:
+        _scheduler.stop(wait=False)
+        print("\n⏹️  Scheduled jobs stopped")
@@ -0,0 +1,98 @@
+"""
+Easypy Engine Scopes
+Slot-indexed variable storage for the engine
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional
+
+# Marks a slot that has never been assigned (None is a valid Easypy value)
+UNSET = object()
+
+class SlotTable:
+    """Slot numbers for the variable names of one engine.
+
+    The compiler hands out a number the first time it sees a name; every
+    Scope sharing the table agrees on them.
+    """
+    __slots__ = ('numbers', 'names')
+
+    def __init__(self):
+        self.numbers: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def slot_for(self, name: str) -> int:
+        """Slot number for a variable name, allocating one on first sight"""
+        slot = self.numbers.get(name)
+        if slot is None:
+            slot = len(self.names)
+            self.names.append(name)
+            self.numbers[name] = slot
+        return slot
+
+    def get(self, name: str) -> Optional[int]:
+        """Slot number for a variable name, or None if it has none yet"""
+        return self.numbers.get(name)
+
+
+class Scope(MutableMapping):
+    """Variables stored in an array indexed by slot number.
+
+    Slot numbers come from `table`, the engine's SlotTable. The compiled IR
+    reads and writes `slots` directly; the mapping interface keeps
+    `engine.vars[name]` working for the CLI and embedding code.
+    """
+    __slots__ = ('table', 'slots', '_assigned')
+
+    def __init__(self, table: Optional[SlotTable] = None):
+        self.table = table if table is not None else SlotTable()
+        self.slots: List[Any] = []
+        # Assigned slots in first-assignment order, like a dict's keys
+        self._assigned: Dict[int, None] = {}
+
+    def load(self, slot: int) -> Any:
+        slots = self.slots
+        return slots[slot] if slot < len(slots) else UNSET
+
+    def store(self, slot: int, value: Any) -> None:
+        slots = self.slots
+        if slot >= len(slots):
+            slots.extend([UNSET] * (slot + 1 - len(slots)))
+        elif slots[slot] is not UNSET:
+            slots[slot] = value
+            return
+        slots[slot] = value
+        self._assigned[slot] = None
+
+    # ============ MAPPING INTERFACE ============
+
+    def __getitem__(self, name: str) -> Any:
+        slot = self.table.get(name)
+        value = UNSET if slot is None else self.load(slot)
+        if value is UNSET:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self.store(self.table.slot_for(name), value)
+
+    def __delitem__(self, name: str) -> None:
+        slot = self.table.get(name)
+        if slot is None or self.load(slot) is UNSET:
+            raise KeyError(name)
+        self.slots[slot] = UNSET
+        del self._assigned[slot]
+
+    def __contains__(self, name) -> bool:
+        slot = self.table.get(name)
+        return slot is not None and self.load(slot) is not UNSET
+
+    def __iter__(self) -> Iterator[str]:
+        for slot in list(self._assigned):
+            yield self.table.names[slot]
+
+    def __len__(self) -> int:
+        return len(self._assigned)
+
+    def __repr__(self) -> str:
+        return f"Scope({dict(self)!r})"
@@ -0,0 +1,35 @@
+"""
+Easypy Streams
+Lazy iterator helpers shared by the engine builtins and transpiled scripts
+"""
+
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+
+def take(n, iterable: Iterable) -> Iterator:
+    """The first n items, without reading further"""
+    return islice(iterable, int(n))
+
+
+def chunk(size, iterable: Iterable) -> Iterator[List]:
+    """Consecutive lists of `size` items; the last one may be shorter"""
+    size = int(size)
+    if size < 1:
+        raise ValueError("chunk size must be at least 1")
+    return _chunks(iter(iterable), size)
+
+
+def _chunks(iterator: Iterator, size: int) -> Iterator[List]:
+    while True:
+        block = list(islice(iterator, size))
+        if not block:
+            return
+        yield block
+
+
+def read_lines(path, encoding: str = 'utf-8') -> Iterator[str]:
+    """Lines of a text file without their line endings, read one at a time"""
+    with open(path, 'r', encoding=encoding) as f:
+        for line in f:
+            yield line.rstrip('\r\n')
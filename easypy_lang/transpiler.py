@@ -4,6 +4,205 @@ Translates Easypy code (.ep) into executable Python code (.py)
 """
 
 import re
+import sys
+from array import array
+
+from .lexer import logical_lines, tokenize
+
+# Strings are matched first so the operators inside them are skipped
+_CLEAN_RE = re.compile(r'"[^"]*"|\'[^\']*\'|===|&&|\|\||!(?!=)')
+_PRINT_QUOTE_RE = re.compile(r'print\(\s*(["\'])')
+_LOG_QUOTE_RE = re.compile(r'log\s+(["\'])')
+_IF_EQUALS_RE = re.compile(r'^(\s*)if\s*=\s*')
+_ELSE_IF_EQUALS_RE = re.compile(r'^(\s*)else\s*if\s*=\s*')
+_ELSE_EQUALS_RE = re.compile(r'^(\s*)else\s*=\s*')
+_LOOP_TIMES_RE = re.compile(r'^(\s*)loop\s+(\d+)\s+times')
+_LOOP_TIMES_ANYWHERE_RE = re.compile(r'loop\s+\d+\s+times')
+_DICT_ENTRY_RE = re.compile(r'[\w"\']+\s*:\s*$')
+_ASSIGNMENT_RE = re.compile(r'[^=!<>]=[^=]')
+# `cached func` or `cached(size=256, ttl=60) func`; group 1 holds the options
+_CACHED_FUNC_RE = re.compile(r'cached(?:\s*\(([^()]*)\)\s*|\s+)(?=func )')
+_DISK_CACHE_FUNC_RE = re.compile(r'disk\s+cache\s+(?=func )')
+# Tokens that matter to `|>`: strings (skipped), brackets, the operator
+# itself, and what ends a pipeline: separators, assignment, comparisons
+# and statement keywords
+_PIPE_SCAN_RE = re.compile(
+    r'"[^"]*"|\'[^\']*\'|\|>|[(\[{)\]}]|[,;:]|[=!<>]=|[=<>]'
+    r'|\b(?:return|emit|yield|in|if|elif|else|while|for|print|log|and|or|not|lambda)\b')
+# Strings, brackets and the comma before a keyword or ** argument
+_ARGUMENT_SCAN_RE = re.compile(r'"[^"]*"|\'[^\']*\'|[(\[{)\]}]|,\s*(?:\*\*|[A-Za-z_]\w*\s*=(?!=))')
+# `[results =] parallel[(options)] for target in items {`
+_PARALLEL_FOR_RE = re.compile(
+    r'(?:(?P<result>[\w.]+(?:\[[^\]]*\])?)\s*=\s*)?parallel(?:\s*\((?P<options>[^()]*)\))?'
+    r'\s+for\s+(?P<target>.+?)\s+in\s+(?P<items>.+?)\s*\{$')
+# `disk cache name(` outside strings, for a single call such as web.get(url)
+_DISK_CACHE_CALL_RE = re.compile(r'"[^"]*"|\'[^\']*\'|\bdisk\s+cache\s+([A-Za-z_][\w.]*)\s*\(')
+# `list<int> xs = ...`: element type, name and (optional) value
+_TYPED_LIST_RE = re.compile(r'list\s*<\s*(\w+)\s*>\s+([A-Za-z_]\w*)\s*(?:=\s*(.*))?$')
+# Element types with compact storage (typedlist.py); others keep a plain list
+_TYPED_LIST_CLASSES = {'int': 'IntList', 'float': 'FloatList'}
+# `emit = 5`, `emit += 1`: the name emit, not the statement
+_EMIT_ASSIGN_RE = re.compile(r'emit\s*(?:\*\*|//|>>|<<|[-+*/%@&|^:])?=(?!=)')
+# `[job =] every[(options)] [N] seconds|minutes|hours|days` then `---> job`
+# or `{` (the arrow is already a colon here)
+_EVERY_RE = re.compile(
+    r'(?:(?P<result>[\w.]+)\s*=\s*)?every(?:\s*\((?P<options>[^()]*)\))?\s+(?:(?P<count>[\w.]+)\s+)?'
+    r'(?P<unit>seconds?|minutes?|hours?|days?)\s*(?::\s*(?P<body>.+)|\{)$')
+# `[job =] at[(options)] "HH:MM"` then `---> job` or `{`
+_AT_RE = re.compile(
+    r'(?:(?P<result>[\w.]+)\s*=\s*)?at(?:\s*\((?P<options>[^()]*)\))?\s+(?P<time>"[^"]*"|\'[^\']*\')\s*(?::\s*(?P<body>.+)|\{)$')
+_SECONDS_PER_UNIT = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def _keyword_arguments(args):
+    """Split a call's argument text before its first keyword or ** argument"""
+    depth = 0
+    # A comma in front lets a keyword in first place match like the others
+    for match in _ARGUMENT_SCAN_RE.finditer(',' + args):
+        token = match.group()
+        if token[0] == '"' or token[0] == "'":
+            continue
+        if token in '([{':
+            depth += 1
+        elif token in ')]}':
+            depth -= 1
+        elif depth == 0:
+            start = match.start()
+            return (args[:start - 1] if start else ''), args[start:]
+    return args, ''
+
+def _pipe_stage(value, stage):
+    """Apply one `|> stage` to value: f(a) becomes f(a, value), f becomes f(value).
+
+    The value goes after the positional arguments, so `sorted(key=len)`
+    becomes sorted(value, key=len).
+    """
+    if stage.endswith(')'):
+        depth = 0
+        for pos in range(len(stage) - 1, -1, -1):
+            char = stage[pos]
+            if char == ')':
+                depth += 1
+            elif char == '(':
+                depth -= 1
+                if depth == 0:
+                    break
+        if depth == 0 and stage[:pos].strip():
+            positional, keywords = _keyword_arguments(stage[pos + 1:-1])
+            arguments = [part.strip() for part in (positional, value, keywords) if part.strip()]
+            return f"{stage[:pos + 1]}{', '.join(arguments)})"
+    return f"{stage}({value})"
+
+def _fold_pipeline(stages):
+    """Join a segment's `|>`-separated stages into nested calls"""
+    if len(stages) == 1:
+        return stages[0]
+    first, last = stages[0], stages[-1]
+    leading = first[:len(first) - len(first.lstrip())]
+    trailing = last[len(last.rstrip()):]
+    value = first.strip()
+    for stage in stages[1:]:
+        value = _pipe_stage(value, stage.strip())
+    return f"{leading}{value}{trailing}"
+
+def _lower_pipelines(text, start=0, end=None):
+    """Rewrite `x |> f(a) |> g` as g(f(a, x)) in text[start:end], at every bracket depth.
+
+    A pipeline runs between the separators, assignments, comparisons and
+    keywords around it, so `ys = xs |> take(3)` and `for y in xs |> take(3)`
+    pipe just xs. Bracketed groups are lowered on their own first.
+    """
+    if end is None:
+        end = len(text)
+    pieces = []
+    stages = []
+    current = []
+    pos = start
+    depth = 0
+    group_start = start
+    for match in _PIPE_SCAN_RE.finditer(text, start, end):
+        token = match.group()
+        if token[0] == '"' or token[0] == "'":
+            continue
+        if token in '([{':
+            if depth == 0:
+                current.append(text[pos:match.start()])
+                current.append(token)
+                group_start = match.end()
+            depth += 1
+        elif token in ')]}':
+            depth -= 1
+            if depth == 0:
+                current.append(_lower_pipelines(text, group_start, match.start()))
+                pos = match.start()
+            elif depth < 0:
+                # Closes a bracket opened before text, on an earlier line:
+                # the pipeline ends here
+                depth = 0
+                current.append(text[pos:match.start()])
+                stages.append(''.join(current))
+                pieces.append(_fold_pipeline(stages))
+                pieces.append(token)
+                stages = []
+                current = []
+                pos = match.end()
+        elif depth > 0:
+            continue
+        elif token == '|>':
+            current.append(text[pos:match.start()])
+            stages.append(''.join(current))
+            current = []
+            pos = match.end()
+        else:
+            current.append(text[pos:match.start()])
+            stages.append(''.join(current))
+            pieces.append(_fold_pipeline(stages))
+            pieces.append(token)
+            stages = []
+            current = []
+            pos = match.end()
+    tail = ''
+    if depth > 0:
+        # A bracket left open, like a block's `{`, ends the pipeline and is
+        # kept as it is
+        tail = current.pop() + text[group_start:end]
+    else:
+        current.append(text[pos:end])
+    stages.append(''.join(current))
+    pieces.append(_fold_pipeline(stages))
+    pieces.append(tail)
+    return ''.join(pieces)
+
+def _join_pipe_lines(lines):
+    """Join a line starting with `|>`, or following one that ends with it,
+    onto the line before, so a pipeline can be continued over several lines"""
+    held = None
+    for line_num, line in lines:
+        if held is not None and (line.lstrip().startswith('|>') or held[1].rstrip().endswith('|>')):
+            held = (held[0], f"{held[1].rstrip()} {line.strip()}")
+            continue
+        if held is not None:
+            yield held
+        held = (line_num, line)
+    if held is not None:
+        yield held
+
+def _disk_cache_call(match):
+    if match.group(1) is None:
+        return match.group()
+    return f"disk_cache({match.group(1)})("
+
+def read_source_map(path):
+    """Source map written by transpile_stream, as an array of .ep lines.
+
+    Entry i belongs to generated line i + 1; 0 marks the header lines.
+    """
+    lines = array('I')
+    with open(path, 'rb') as f:
+        lines.frombytes(f.read())
+    if sys.byteorder == 'big':
+        lines.byteswap()
+    return lines
 
 class EasypyTranspiler:
     def __init__(self):
@@ -11,182 +210,226 @@ class EasypyTranspiler:
         self.context_stack = [] # Stack to track [class, func, other]
         self.in_block = False
         self.source_map = {} # Maps generated python line -> original ep line
+        self.parallel_calls = [] # parallel_map() calls run when their loop closes
+        self.parallel_count = 0
+        self.scheduled_calls = [] # schedule_every/at() calls made when their job closes
+        self.job_count = 0
+        self.stream_emits = [] # Whether each open stream func has emitted yet
+        self.class_fields = {} # Generated line of a class -> its `var` fields
+        self.typed_lists = {} # Generated line of a multi-line typed list -> its class
+        self.open_classes = [] # Generated lines of the classes being defined
+        self.next_py_line = 1
         
     def transpile(self, source_code):
         """Convert Easypy source to Python source"""
-        # STEP 0: NORMALIZE FORMATTING
-        # This allows users to write "if(x){print(x)}" on one line, or "}}}" on one line.
-        source_code = self._normalize_source(source_code)
-        
-        source_lines = source_code.split('\n')
-        py_lines = [
-            "import sys",
-            "import os",
-            "from easypy_lang.modules_real import *" 
-        ]
-        
-        # Offset for the header lines added above
-        current_py_line = len(py_lines) + 1 
-        
-        # Pre-process for multi-line support (simple paren counting)
-        # We will iterate original lines but might combine them in processing?
-        # Actually, simpler approach for "Unlimited":
-        # Keep 1-to-1 mapping as much as possible, or insert stub lines to keep count synced.
-        # But since we remove braces '}', line counts drift. 
-        # So we MUST rely on self.source_map.
+        return "\n".join(self.transpile_lines(source_code))
+
+    def transpile_lines(self, source_code):
+        """Generate the Python source line by line.
+
+        source_code is a string or an iterable of chunks; the lexer reads it
+        in one pass and its logical lines feed the translation rules as they
+        are produced. source_map fills in as lines are generated.
+        """
+        current_py_line = 1
+        for ep_line, py_line in self._generate(source_code):
+            if ep_line is not None:
+                self.source_map[current_py_line] = ep_line
+            current_py_line += 1
+            yield py_line
+
+    def transpile_stream(self, source_code, out, map_out=None, batch=4096):
+        """Transpile into a text stream without holding either file in memory.
+
+        source_code is an iterable of chunks, typically an open .ep file, which
+        yields one line at a time. Generated lines are written to `out` in
+        batches, and when map_out (a binary stream) is given the source map is
+        written there as a compact array instead of filling source_map: one
+        little-endian uint32 per generated line holding its .ep line, 0 for
+        the header. Memory stays bounded by the block nesting depth.
+        Returns the number of lines written.
+        """
+        lines = []
+        ep_lines = array('I')
+        written = 0
+        for ep_line, py_line in self._generate(source_code):
+            lines.append(py_line)
+            ep_lines.append(ep_line or 0)
+            if len(lines) >= batch:
+                written += self._flush_stream(lines, ep_lines, out, map_out)
+        written += self._flush_stream(lines, ep_lines, out, map_out)
+        return written
+
+    def _flush_stream(self, lines, ep_lines, out, map_out):
+        count = len(lines)
+        if count:
+            lines.append('')
+            out.write('\n'.join(lines))
+            if map_out is not None:
+                if sys.byteorder == 'big':
+                    ep_lines.byteswap()
+                map_out.write(ep_lines.tobytes())
+            del lines[:]
+            del ep_lines[:]
+        return count
+
+    def _generate(self, source_code):
+        """(.ep line, Python line) pairs; the header lines have no .ep line"""
+        yield None, "import sys"
+        yield None, "import os"
+        yield None, "from easypy_lang.modules_real import *"
         
-        buffer_line = ""
-        buffer_start_idx = 0
+        # Braces are removed and statements split, so line counts drift from
+        # the .ep file; the lexer reports each line's original number.
         paren_depth = 0
+        original_line_num = 1
+        self.next_py_line = 4
         
-        for i, line in enumerate(source_lines):
+        for line_num, line in _join_pipe_lines(logical_lines(tokenize(source_code))):
             raw_line = line.strip()
-            original_line_num = i + 1
+            if line_num is not None:
+                original_line_num = line_num
             
-            # Skip empty lines but keep them in output to preserve some spacing? 
-            # OR just map them.
+            # Blank lines are kept to preserve spacing, unless inside an
+            # unclosed bracket
             if not raw_line and paren_depth == 0:
-                py_lines.append("")
-                self.source_map[current_py_line] = original_line_num
-                current_py_line += 1
+                self.next_py_line += 1
+                yield original_line_num, ""
                 continue
                 
-            # Handle Multi-line concatenation
             # Count parens
             paren_depth += raw_line.count('(') - raw_line.count(')')
             paren_depth += raw_line.count('[') - raw_line.count(']')
             paren_depth += raw_line.count('{') - raw_line.count('}') # Logic block braces
-             # Note: Braces {} in easypy are blocks, not dicts usually, unless in var definition. 
-             # Implementation detail: We treat ' {' as block starter.
-            
-            if buffer_line:
-                buffer_line += " " + raw_line
-            else:
-                buffer_line = raw_line
-                buffer_start_idx = original_line_num
-            
-            # If we are inside an expression (parens open), don't process yet
-            # EXCEPTION: If the line ends with '{', it's a block starter, usually handled immediately in our logic
-            if paren_depth > 0:
-                # Check if it's just a block starter line "if (..) {"
-                # Our previous logic relied on line.endswith("{").
-                # If we have unbalanced parens, we wait.
-                # But braces { } are used for blocks. 
-                # Let's trust Python's tolerance for newlines inside parens and output as is?
-                # No, we need to handle the conversion logic (func, if, etc).
-                pass
-
-            # === LINE PROCESSING ===
-            # We process 'line' (or buffer). 
-            # To simplify "Unlimited", we process line-by-line primarily, 
-            # assuming users write "if (cond) {" on one line or utilize python's line continuation.
-            
-            # Reverting complex multi-line buffer for reliability in this specific tool call
-            # We will use the direct processing but record the source map.
             
             processed_line = self._process_line(raw_line)
             
-            # Append to output
+            # None means a closing brace that only reduced indent; rules
+            # that emit a decorator put it on a line of its own
             if processed_line is not None:
-                py_lines.append(processed_line)
-                self.source_map[current_py_line] = original_line_num
-                current_py_line += 1
-            else:
-                # If returns None, maybe it was a closing brace } that reduced indent only
-                # We still might want to track it or just ignore
-                pass
+                if '\n' in processed_line:
+                    for piece in processed_line.split('\n'):
+                        self.next_py_line += 1
+                        yield original_line_num, piece
+                else:
+                    self.next_py_line += 1
+                    yield original_line_num, processed_line
 
-        return "\n".join(py_lines)
+    def transpile_ast(self, source_code, filename="<easypy>", importable=False):
+        """Convert Easypy source to an ast.Module located on the .ep lines"""
+        return self.python_to_ast(self.transpile(source_code), source_code, filename, importable)
 
-    def _normalize_source(self, code):
-        """
-        Splits code into clean lines based on { and } delimiters,
-        respecting strings/quotes.
-        Example: 'if(x){print(y)}' -> 
-        if(x){
-        print(y)
-        }
+    def python_to_ast(self, py_code, source_code, filename="<easypy>", importable=False):
+        """Parse generated Python once and move every node onto its .ep line.
+
+        Line numbers come from source_map; columns are shifted by the
+        difference in indentation and clamped to the .ep line, so compiling
+        the tree under the .ep filename gives tracebacks, profilers and
+        linecache the script's own lines. The header's imports belong to no
+        .ep line and are put on line 0, which profilers leave out. A
+        SyntaxError in the generated code is re-raised against the .ep line
+        that produced it.
+
+        Classes with `var` fields get __slots__ (layout.py) unless
+        `importable` says other modules may import this one: their use of
+        its instances cannot be seen from here.
+
+        The rules still write Python text, so this is the one parse exec()
+        used to do, not an extra one; what changes is that the tree it
+        gives is located on the .ep source before compile() sees it.
         """
-        normalized = []
-        current_token = ""
-        in_quote = False
-        quote_char = ""
-        
-        for char in code:
-            if char in ['"', "'"]:
-                if not in_quote:
-                    in_quote = True
-                    quote_char = char
-                elif char == quote_char:
-                    in_quote = False
-                    quote_char = ""
-            
-            if not in_quote:
-                if char == '{':
-                    # Block start: ensure it's on its own line-end or joined with prev
-                    # We want "if (x) {" to stay together usually for the parser logic,
-                    # BUT "func x() { print" should split.
-                    # Simplest strategy: Insert newline AFTER {
-                    normalized.append(current_token + "{")
-                    normalized.append("\n")
-                    current_token = ""
-                    continue
-                elif char == '}':
-                    # Block end: ensure it has newline BEFORE and AFTER
-                    if current_token.strip():
-                        normalized.append(current_token)
-                        normalized.append("\n")
-                    normalized.append("}")
-                    normalized.append("\n")
-                    current_token = ""
-                    continue
-                elif char == ';':
-                    # Treat semicolon as newline
-                    if current_token.strip():
-                        normalized.append(current_token)
-                        normalized.append("\n")
-                    current_token = ""
-                    continue
-            
-            current_token += char
-            
-        if current_token.strip():
-            normalized.append(current_token)
-            
-        return "".join(normalized)
+        # Not needed on a cache hit, so kept off the startup path
+        import ast
+
+        ep_lines = source_code.split('\n')
+        try:
+            tree = ast.parse(py_code, filename)
+        except SyntaxError as e:
+            line = self.source_map.get(e.lineno, 1) if e.lineno else 1
+            text = ep_lines[line - 1] if line <= len(ep_lines) else None
+            raise SyntaxError(e.msg, (filename, line, None, text)) from None
+        if self.typed_lists:
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Assign) and node.lineno in self.typed_lists:
+                    container = ast.Name(id=self.typed_lists[node.lineno], ctx=ast.Load())
+                    node.value = ast.copy_location(
+                        ast.Call(func=ast.copy_location(container, node.value), args=[node.value], keywords=[]),
+                        node.value)
+        if not importable and any(self.class_fields.values()):
+            from .layout import apply_slots
+            apply_slots(tree, self.class_fields)
+        if self.job_count:
+            from .jobscope import declare_job_names
+            declare_job_names(tree)
+
+        py_lines = py_code.split('\n')
+        # Python line -> (.ep line, column shift, .ep line length)
+        positions = {}
+        def position(py_line):
+            found = positions.get(py_line)
+            if found is None:
+                ep_line = self.source_map.get(py_line, 0)
+                ep_text = ep_lines[ep_line - 1] if 0 < ep_line <= len(ep_lines) else ""
+                py_text = py_lines[py_line - 1] if py_line <= len(py_lines) else ""
+                shift = ((len(ep_text) - len(ep_text.lstrip()))
+                         - (len(py_text) - len(py_text.lstrip())))
+                found = positions[py_line] = (ep_line, shift, len(ep_text))
+            return found
+
+        for node in ast.walk(tree):
+            if 'lineno' not in node._attributes:
+                continue
+            line, shift, length = position(node.lineno)
+            node.lineno = line
+            node.col_offset = min(max(node.col_offset + shift, 0), length)
+            if getattr(node, 'end_lineno', None) is not None:
+                end_line, end_shift, end_length = position(node.end_lineno)
+                node.end_lineno = end_line
+                end_col = min(max(node.end_col_offset + end_shift, 0), end_length)
+                if end_line == line:
+                    end_col = max(end_col, node.col_offset)
+                node.end_col_offset = end_col
+        return tree
 
     def _clean_expression(self, text):
         """Helper to convert C-style syntax to Python"""
-        # Protect strings from replacement
-        # placeholders mapping: string_content -> placeholder
-        placeholders = {}
-        def replace_str(match):
-            key = f"__STR_{len(placeholders)}__"
-            placeholders[key] = match.group(0)
-            return key
-        
-        # Temporarily replace strings with placeholders
-        # Regex for double and single quotes
-        text_safe = re.sub(r'("[^"]*"|\'[^\']*\')', replace_str, text)
-
-        # Operators
-        text_safe = text_safe.replace("===", "==")
-        text_safe = text_safe.replace("&&", " and ")
-        text_safe = text_safe.replace("||", " or ")
-        
-        # '!' but not '!='
-        # Only replace if preceded by start-of-line, space, '(', '[', or '='
-        text_safe = re.sub(r'(?:^|(?<=[=\s(\[]))!(?!=)', 'not ', text_safe)
-
-        # Restore strings
-        for key, val in placeholders.items():
-            text_safe = text_safe.replace(key, val)
-        
-        return text_safe
-        # but replacing them here can be safer for some edge cases.
-        # But let's stick to the aliases to avoid accidental string replacement.
-        
-        return text
+        # One scan: string literals are copied through untouched, operators
+        # outside them are rewritten
+        out = []
+        pos = 0
+        # Character a '!' at pos would follow; literals count as '_'
+        before = None
+        for match in _CLEAN_RE.finditer(text):
+            start = match.start()
+            if start > pos:
+                out.append(text[pos:start])
+                before = text[start - 1]
+            token = match.group()
+            first = token[0]
+            if first == '"' or first == "'":
+                out.append(token)
+                before = '_'
+            elif token == '===':
+                out.append('==')
+                before = '='
+            elif token == '&&':
+                out.append(' and ')
+                before = ' '
+            elif token == '||':
+                out.append(' or ')
+                before = ' '
+            else:
+                # '!' but not '!='; only at the start or after '=', space, '(' or '['
+                if before is None or before in '=([' or before.isspace():
+                    out.append('not ')
+                else:
+                    out.append('!')
+                before = '!'
+            pos = match.end()
+        if not out:
+            return text
+        out.append(text[pos:])
+        return "".join(out)
 
     def _preprocess_line(self, line):
         """Handle 'Advanced' syntax: --->, if =, implicit f-strings"""
@@ -195,43 +438,120 @@ class EasypyTranspiler:
         # Detect if {var} pattern exists inside quotes
         if ('print(' in line or 'log ' in line) and '{' in line and '}' in line:
             # Simple heuristic: inject 'f' before quotes
-            # Handle double quotes
-            line = re.sub(r'print\(\s*"', 'print(f"', line)
-            line = re.sub(r'log\s+"', 'log f"', line)
-            # Handle single quotes
-            line = re.sub(r"print\(\s*'", "print(f'", line)
-            line = re.sub(r"log\s+'", "log f'", line)
+            line = _PRINT_QUOTE_RE.sub(r'print(f\1', line)
+            line = _LOG_QUOTE_RE.sub(r'log f\1', line)
 
         # 2. Syntax Sugar: Arrow
         if "--->" in line:
             line = line.replace("--->", ":")
 
         # 3. Syntax Sugar: if =, else if =, else =
-        line = re.sub(r'^(\s*)if\s*=\s*', r'\1if ', line)
-        line = re.sub(r'^(\s*)else\s*if\s*=\s*', r'\1elif ', line)
-        # Fix: else = statement needs a colon for inline usage
-        line = re.sub(r'^(\s*)else\s*=\s*', r'\1else: ', line)
+        if '=' in line:
+            line = _IF_EQUALS_RE.sub(r'\1if ', line)
+            line = _ELSE_IF_EQUALS_RE.sub(r'\1elif ', line)
+            # Fix: else = statement needs a colon for inline usage
+            line = _ELSE_EQUALS_RE.sub(r'\1else: ', line)
+
+        # 4. Persistent call cache: `disk cache web.get(url)`
+        if "disk" in line and not _DISK_CACHE_FUNC_RE.match(line):
+            line = _DISK_CACHE_CALL_RE.sub(_disk_cache_call, line)
 
-        # 4. Handle "else if" without equals
+        # 4b. Pipelines: `xs |> filter(f) |> take(10)` -> take(10, filter(f, xs))
+        if "|>" in line:
+            line = _lower_pipelines(line)
+
+        # 4c. Handle "else if" without equals
         line = line.replace("else if", "elif")
 
         # 5. Loop syntax conversion (loop N times)
         # Supports both "loop 3 times:" and "loop 3 times {"
-        # We replace the start with pythonic loop
-        loop_match = re.match(r'^(\s*)loop\s+(\d+)\s+times', line)
+        # Replace 'loop N times' with 'for _ in range(N)', leaving the
+        # suffix (colon or brace) for the next step
+        loop_match = _LOOP_TIMES_RE.match(line)
         if loop_match:
-            indent = loop_match.group(1)
             count = loop_match.group(2)
-            # Replace 'loop N times' with 'for _ in range(N)'
-            # We leave the suffix (colon or brace) for the next step
-            line = re.sub(r'loop\s+\d+\s+times', f'for _ in range({count})', line, count=1)
+            line = _LOOP_TIMES_ANYWHERE_RE.sub(f'for _ in range({count})', line, count=1)
 
         return line
 
+    def _parallel_for(self, match, indent):
+        self.parallel_count += 1
+        worker = f"_ep_parallel_{self.parallel_count}"
+        target = match.group('target').strip()
+        arguments = [worker, match.group('items')]
+        for option in (match.group('options') or '').split(','):
+            option = option.strip()
+            if option:
+                arguments.append(option if '=' in option else f'mode="{option}"')
+        call = f"parallel_map({', '.join(arguments)})"
+        if match.group('result'):
+            call = f"{match.group('result')} = {call}"
+        self.parallel_calls.append(call)
+
+        self.indent_level += 1
+        self.context_stack.append('parallel')
+        if target.isidentifier():
+            return f"{indent}def {worker}({target}):"
+        # Unpack a tuple target inside the worker
+        return f"{indent}def {worker}(_ep_item):\n{indent}    {target} = _ep_item"
+
+    def _in_stream(self):
+        """Whether the innermost enclosing function is a stream func"""
+        for ctx in reversed(self.context_stack):
+            if ctx == 'stream':
+                return True
+            if ctx in ('func', 'class', 'parallel', 'schedule'):
+                return False
+        return False
+
+    def _scheduled(self, match, indent, call):
+        """Job function for an `every` or `at` statement; call is the open schedule_*( call"""
+        self.job_count += 1
+        job = f"_ep_job_{self.job_count}"
+        arguments = [job]
+        for option in (match.group('options') or '').split(','):
+            option = option.strip()
+            if option:
+                arguments.append(option if '=' in option else f'mode="{option}"')
+        call = f"{call}, {', '.join(arguments)})"
+        if match.group('result'):
+            call = f"{match.group('result')} = {call}"
+
+        body = match.group('body')
+        if body is None:
+            self.scheduled_calls.append(call)
+            self.indent_level += 1
+            self.context_stack.append('schedule')
+            return f"{indent}def {job}():"
+        # One-line job: the statement after ---> goes through the usual rules
+        self.indent_level += 1
+        statement = self._process_line(body.strip())
+        self.indent_level -= 1
+        if statement is None:
+            statement = f"{indent}    pass"
+        return f"{indent}def {job}():\n{statement}\n{indent}{call}"
+
+    def _typed_list(self, element, name, value):
+        """Assignment for a `list<element>` declaration"""
+        container = _TYPED_LIST_CLASSES.get(element)
+        if value is None:
+            return f"{name} = {container or 'list'}()"
+        if container is None:
+            return f"{name} = {value}"
+        depth = (value.count('(') - value.count(')') + value.count('[') - value.count(']')
+                 + value.count('{') - value.count('}'))
+        if depth != 0:
+            # A value continued on the next lines is wrapped once parsed
+            # (python_to_ast)
+            self.typed_lists[self.next_py_line] = container
+            return f"{name} = {value}"
+        return f"{name} = {container}({value})"
+
     def _process_line(self, raw_line):
         # Indentation handling (Closing Brace)
         # Handle cases like "}" or "} else {" or "}}"
         closing_braces = ""
+        closing_lines = []
         while raw_line.startswith("}"):
             ctx = self.context_stack[-1] if self.context_stack else 'block'
             if ctx == 'dict':
@@ -240,12 +560,25 @@ class EasypyTranspiler:
             self.indent_level -= 1
             if self.indent_level < 0: self.indent_level = 0
             if self.context_stack: self.context_stack.pop()
+            if ctx == 'parallel':
+                # The loop body is now a complete worker function; run it
+                closing_lines.append(f"{'    ' * self.indent_level}{self.parallel_calls.pop()}")
+            elif ctx == 'schedule':
+                # The job body is complete; hand it to the scheduler
+                closing_lines.append(f"{'    ' * self.indent_level}{self.scheduled_calls.pop()}")
+            elif ctx == 'class':
+                self.open_classes.pop()
+            elif ctx == 'stream' and not self.stream_emits.pop():
+                # A stream func with no emit is still a generator, just empty
+                closing_lines.append(f"{'    ' * (self.indent_level + 1)}yield from ()")
             raw_line = raw_line[1:].strip()
             
         # If line was just "}", it is now empty. 
         if not raw_line:
             if closing_braces:
                  return f"{'    ' * self.indent_level}{closing_braces}"
+            if closing_lines:
+                return "\n".join(closing_lines)
             return None
 
         # Prepare current indentation string
@@ -277,6 +610,13 @@ class EasypyTranspiler:
                 else:
                     return f"{indent}import {mod}"
 
+        # 1a. Generators: `emit x` hands x to whoever reads the stream; only
+        # a stream func emits, elsewhere `emit` is an ordinary name
+        if ((raw_line.startswith("emit ") or raw_line == "emit")
+                and not _EMIT_ASSIGN_RE.match(raw_line) and self._in_stream()):
+            self.stream_emits[-1] = True
+            return f"{indent}yield{raw_line[4:]}"
+
         # 1b. Logging/Printing
         if raw_line.startswith("log "):
             content = raw_line[4:]
@@ -288,17 +628,73 @@ class EasypyTranspiler:
 
         # 2. Var and Types
         # Support "string name =", "int count =", "var x ="
+        declared = False
         if raw_line.startswith("var "):
             raw_line = raw_line[4:]
+            declared = True
+
+        # `list<int> xs = [...]` stores unboxed numbers in an IntList
+        typed_match = _TYPED_LIST_RE.match(raw_line)
+        if typed_match:
+            raw_line = self._typed_list(*typed_match.groups())
+            declared = True
         
         # Strip explicit types (simple approach)
         types = ["string ", "int ", "float ", "bool ", "list ", "dict "]
         for t in types:
             if raw_line.startswith(t):
                 raw_line = raw_line[len(t):]
+                declared = True
                 break
+
+        # Fields declared in a class body become its __slots__ (layout.py)
+        if declared and self.context_stack and self.context_stack[-1] == 'class':
+            name, equals, _ = raw_line.partition('=')
+            if equals and name.strip().isidentifier():
+                self.class_fields[self.open_classes[-1]].append(name.strip())
         
+        # 2b. Parallel loops: the body becomes a worker function, and the
+        # closing brace emits the parallel_map() call (parallel.py) that
+        # runs it over the items; each iteration's return value is collected
+        parallel_match = _PARALLEL_FOR_RE.match(raw_line)
+        if parallel_match:
+            return self._parallel_for(parallel_match, indent)
+
+        # 2c. Scheduled jobs: `every 5 minutes ---> task()` and
+        # `at "02:00" { ... }` become a job function that scheduler.py runs
+        every_match = _EVERY_RE.match(raw_line)
+        if every_match:
+            count, unit = every_match.group('count'), _SECONDS_PER_UNIT[every_match.group('unit').rstrip('s')]
+            if count is None:
+                interval = str(unit)
+            elif unit == 1:
+                interval = count
+            else:
+                interval = f"{count} * {unit}"
+            return self._scheduled(every_match, indent, f"schedule_every({interval}")
+        at_match = _AT_RE.match(raw_line)
+        if at_match:
+            return self._scheduled(at_match, indent, f"schedule_at({at_match.group('time')}")
+
         # 3. Functions
+        # `cached func` memoizes the function with memo.memo, which the
+        # header's star import provides, `disk cache func` stores results
+        # across runs (diskmemo.py) and `stream func` is a generator
+        decorator = ""
+        context = 'func'
+        cached_match = _CACHED_FUNC_RE.match(raw_line)
+        disk_match = _DISK_CACHE_FUNC_RE.match(raw_line)
+        if cached_match and raw_line.endswith("{"):
+            decorator = f"{indent}@memo({cached_match.group(1) or ''})\n"
+            raw_line = raw_line[cached_match.end():]
+        elif disk_match and raw_line.endswith("{"):
+            decorator = f"{indent}@disk_cache\n"
+            raw_line = raw_line[disk_match.end():]
+        elif raw_line.startswith("stream func ") and raw_line.endswith("{"):
+            context = 'stream'
+            self.stream_emits.append(False)
+            raw_line = raw_line[7:]
+
         if raw_line.startswith("func ") and raw_line.endswith("{"):
             defn = raw_line[5:-1].strip()
             
@@ -314,8 +710,8 @@ class EasypyTranspiler:
                     defn = f"{name}(self)"
 
             self.indent_level += 1
-            self.context_stack.append('func')
-            return f"{indent}def {defn}:"
+            self.context_stack.append(context)
+            return f"{decorator}{indent}def {defn}:"
         
         # 3b. Async Functions
         if raw_line.startswith("async func ") and raw_line.endswith("{"):
@@ -341,6 +737,8 @@ class EasypyTranspiler:
             defn = raw_line[6:-1].strip()
             self.indent_level += 1
             self.context_stack.append('class')
+            self.open_classes.append(self.next_py_line)
+            self.class_fields[self.next_py_line] = []
             return f"{indent}class {defn}:"
 
         # 5. Logic
@@ -398,9 +796,9 @@ class EasypyTranspiler:
              # But NOT "if x == {" (comparison)
              
              # Also check for nested dictionary structure: "key": {
-             is_dict_entry = bool(re.search(r'[\w"\']+\s*:\s*$', clean_line)) # Ends with colon
+             is_dict_entry = bool(_DICT_ENTRY_RE.search(clean_line)) # Ends with colon
              
-             is_assignment = re.search(r'[^=!<>]=[^=]', clean_line) or clean_line.endswith("=")
+             is_assignment = _ASSIGNMENT_RE.search(clean_line) or clean_line.endswith("=")
              
              # Check if current context is 'dict' (nested)
              in_dict_context = self.context_stack and self.context_stack[-1] == 'dict'
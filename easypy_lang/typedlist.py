@@ -0,0 +1,129 @@
+"""
+Easypy Typed Lists
+Compact storage behind `list<int>` and `list<float>` declarations
+"""
+
+from array import array
+from typing import Callable, Iterable, Optional
+
+
+class _TypedList(array):
+    """An array.array of one machine type that also behaves like a list.
+
+    Elements are stored unboxed, 8 bytes each, so a million numbers take
+    8 MB instead of the 32-40 MB of a list of float or int objects. Besides
+    the array methods (append, extend, insert, pop, remove, index, count,
+    reverse) it has sort, copy and clear, `+` with any iterable, list
+    comparison, and slices of the same class. str() and interpolation show
+    it as a list, `[1, 2]`. Storing a value the type cannot hold raises
+    TypeError or OverflowError. The json module does not know arrays: `db`
+    saves them as lists, and elsewhere pass tolist() or
+    `default=json_default`.
+    """
+
+    typecode_for = ''
+
+    def __new__(cls, items: Iterable = ()):
+        return array.__new__(cls, cls.typecode_for, items)
+
+    def __add__(self, other):
+        result = self.copy()
+        result.extend(other)
+        return result
+
+    def __radd__(self, other):
+        result = type(self)(other)
+        result.extend(self)
+        return result
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __mul__(self, count):
+        return type(self)(array.__mul__(self, count))
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if isinstance(other, (list, array)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    # Ordering compares element by element, as lists do
+    def __lt__(self, other):
+        if isinstance(other, (list, array)):
+            return self.tolist() < list(other)
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, (list, array)):
+            return self.tolist() <= list(other)
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, (list, array)):
+            return self.tolist() > list(other)
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, (list, array)):
+            return self.tolist() >= list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getitem__(self, index):
+        if type(index) is slice:
+            return type(self)(array.__getitem__(self, index))
+        return array.__getitem__(self, index)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.tolist()!r})"
+
+    def __str__(self):
+        return str(self.tolist())
+
+    def __reduce__(self):
+        return type(self), (self.tolist(),)
+
+    def sort(self, key: Optional[Callable] = None, reverse: bool = False) -> None:
+        self[:] = type(self)(sorted(self.tolist(), key=key, reverse=reverse))
+
+    def copy(self):
+        return type(self)(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def clear(self) -> None:
+        del self[:]
+
+    def to_numpy(self):
+        """A NumPy array sharing this list's memory (NumPy must be installed)"""
+        import numpy
+        return numpy.frombuffer(self, dtype=numpy.int64 if self.typecode == 'q' else numpy.float64)
+
+
+class IntList(_TypedList):
+    """`list<int>`: signed 64-bit integers"""
+    typecode_for = 'q'
+
+
+class FloatList(_TypedList):
+    """`list<float>`: double precision floats"""
+    typecode_for = 'd'
+
+
+def json_default(value):
+    """`default=` hook for json.dump that writes typed lists as lists"""
+    if isinstance(value, array):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
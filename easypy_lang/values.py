@@ -0,0 +1,194 @@
+"""
+Easypy Value Parsing
+Single-pass lexer shared by the engine and its compiler for splitting and reading values
+"""
+
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+_NUMBER_RE = re.compile(r'-?\d+(\.\d+)?')
+# Anything that makes a span more than a flat run of scalars
+_NESTED_RE = re.compile(r'[\[\]{}"\']')
+_KEYWORDS = {'true': True, 'false': False, 'none': None, 'null': None, 'nil': None}
+_STRUCTURE_RES: Dict[Any, Any] = {}
+
+
+class _SpanIndex:
+    """Delimiter and bracket positions of one text, found in a single scan.
+
+    `splits[d]` holds the positions of unquoted delimiters seen at bracket
+    depth d, in order; `opens[p]` is the depth just before the unquoted
+    opening bracket at position p. A container opened at p therefore splits
+    on `splits[opens[p] + 1]` within its own span, which is exactly what
+    re-running smart_split on its inner text would find.
+    """
+    __slots__ = ('splits', 'opens')
+
+    def __init__(self, text: str, delimiter: str, parens: bool = False):
+        key = (delimiter, parens)
+        pattern = _STRUCTURE_RES.get(key)
+        if pattern is None:
+            brackets = '\\[\\]{}()' if parens else '\\[\\]{}'
+            pattern = re.compile('["\'' + brackets + re.escape(delimiter) + ']')
+            _STRUCTURE_RES[key] = pattern
+
+        splits: Dict[int, List[int]] = {}
+        opens: Dict[int, int] = {}
+        depth = 0
+        quote = None
+        for match in pattern.finditer(text):
+            char = match.group()
+            if quote is not None:
+                if char == quote:
+                    quote = None
+            elif char == '"' or char == "'":
+                quote = char
+            elif char == '[' or char == '{' or char == '(':
+                opens[match.start()] = depth
+                depth += 1
+            elif char == ']' or char == '}' or char == ')':
+                depth -= 1
+            else:
+                positions = splits.get(depth)
+                if positions is None:
+                    positions = splits[depth] = []
+                positions.append(match.start())
+
+        self.splits = splits
+        self.opens = opens
+
+    def between(self, depth: int, start: int, end: int) -> List[int]:
+        positions = self.splits.get(depth)
+        if not positions:
+            return []
+        return positions[bisect_left(positions, start):bisect_left(positions, end)]
+
+
+class _Source:
+    """Text being parsed, with its span index built on first use"""
+    __slots__ = ('text', '_index')
+
+    def __init__(self, text: str):
+        self.text = text
+        self._index = None
+
+    def split_points(self, open_pos: int, start: int, end: int) -> Optional[List[int]]:
+        """Top-level comma positions inside the container opened at open_pos.
+
+        Returns None when that bracket sits inside a quote of the enclosing
+        text; the container then has to be read on its own terms.
+        """
+        if self._index is None:
+            self._index = _SpanIndex(self.text, ',')
+        depth = self._index.opens.get(open_pos)
+        if depth is None:
+            return None
+        return self._index.between(depth + 1, start, end)
+
+
+def _strip_span(text: str, start: int, end: int):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _parse_scalar(word: str) -> Any:
+    """Parse a stripped value that holds no brackets or quotes"""
+    if len(word) <= 5:
+        lowered = word.lower()
+        if lowered in _KEYWORDS:
+            return _KEYWORDS[lowered]
+    if _NUMBER_RE.fullmatch(word):
+        return float(word) if '.' in word else int(word)
+    return word
+
+
+def _pieces(text: str, start: int, end: int, points: List[int]):
+    """Yield (start, end) of each delimited piece; an empty final piece is dropped"""
+    for point in points:
+        yield start, point
+        start = point + 1
+    if start < end:
+        yield start, end
+
+
+def _parse_list(source: _Source, start: int, end: int) -> list:
+    text = source.text
+    inner_start, inner_end = _strip_span(text, start + 1, end - 1)
+    if inner_start == inner_end:
+        return []
+
+    if _NESTED_RE.search(text, inner_start, inner_end) is None:
+        items = text[inner_start:inner_end].split(',')
+        if not items[-1]:
+            items.pop()
+        return [_parse_scalar(item.strip()) for item in items]
+
+    points = source.split_points(start, inner_start, inner_end)
+    if points is None:
+        return parse_value(text[start:end])
+    return [_parse_span(source, s, e) for s, e in _pieces(text, inner_start, inner_end, points)]
+
+
+def _parse_dict(source: _Source, start: int, end: int) -> dict:
+    text = source.text
+    inner_start, inner_end = _strip_span(text, start + 1, end - 1)
+    if inner_start == inner_end:
+        return {}
+
+    points = source.split_points(start, inner_start, inner_end)
+    if points is None:
+        return parse_value(text[start:end])
+    result = {}
+    for s, e in _pieces(text, inner_start, inner_end, points):
+        colon = text.find(':', s, e)
+        if colon != -1:
+            result[text[s:colon].strip()] = _parse_span(source, colon + 1, e)
+    return result
+
+
+def _parse_span(source: _Source, start: int, end: int) -> Any:
+    text = source.text
+    start, end = _strip_span(text, start, end)
+    if start == end:
+        return ''
+
+    first = text[start]
+    last = text[end - 1]
+
+    if first == '[' and last == ']':
+        try:
+            return _parse_list(source, start, end)
+        except RecursionError:
+            pass
+    elif first == '{' and last == '}':
+        try:
+            return _parse_dict(source, start, end)
+        except RecursionError:
+            pass
+    elif (first == '"' and last == '"') or (first == "'" and last == "'"):
+        return text[start + 1:end - 1]
+    else:
+        return _parse_scalar(text[start:end])
+
+    return text[start:end]
+
+
+def smart_split(text: str, delimiter: str) -> List[str]:
+    """Split respecting brackets and quotes"""
+    points = _SpanIndex(text, delimiter).between(0, 0, len(text))
+    return [text[s:e] for s, e in _pieces(text, 0, len(text), points)]
+
+
+def split_args(text: str) -> List[str]:
+    """Split a call's argument list on top-level commas; parentheses nest too"""
+    points = _SpanIndex(text, ',', parens=True).between(0, 0, len(text))
+    return [text[s:e] for s, e in _pieces(text, 0, len(text), points)]
+
+
+def parse_value(val: str) -> Any:
+    """Convert string to appropriate type"""
+    return _parse_span(_Source(val), 0, len(val))
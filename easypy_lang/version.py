@@ -0,0 +1,17 @@
+"""
+Easypy Versions
+Versions of the code generators, part of every on-disk cache key
+"""
+
+# Kept out of the generators themselves so that a cache hit (cache.py,
+# build.py) does not have to import them. Bump one whenever its module
+# produces different code for the same .ep source.
+
+# transpiler.py, and jobscope.py which it runs on every script with jobs
+TRANSPILER_VERSION = "17"
+# layout.py: the __slots__ given to classes with `var` fields
+LAYOUT_VERSION = "1"
+# optimizer.py: the -O passes
+OPTIMIZER_VERSION = "1"
+
+CACHE_VERSION = f"{TRANSPILER_VERSION}.{LAYOUT_VERSION}.{OPTIMIZER_VERSION}"